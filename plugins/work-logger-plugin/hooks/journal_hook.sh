@@ -0,0 +1,88 @@
+#!/bin/bash
+
+# Append one fixed-schema record per Claude Code event to today's work journal.
+#
+# Usage (from hooks.json): journal_hook.sh tool    (PostToolUse)
+#                          journal_hook.sh prompt  (UserPromptSubmit)
+#
+# Record (tab-separated, one line):
+#   epoch  session  event  tool  project_dir  file_path  prompt_preview
+#
+# Text fields are copied still JSON-escaped from the hook input (tabs and
+# newlines are blanked); parsers/hook_journal.py decodes them. Apart from one
+# `head`, only bash builtins run per event, and only the first 64 KB of the
+# input is read (tool results come last and are not needed).
+
+# The journal is on by default; WORK_LOGGER_JOURNAL=0 turns it off
+[ "${WORK_LOGGER_JOURNAL:-1}" = "0" ] && exit 0
+
+EVENT="$1"
+JOURNAL_DIR="${WORK_LOGGER_HOME:-$HOME/.claude/work-logger}/journal"
+
+INPUT=$(head -c 65536)
+# bash 4.2+ formats time without forking; macOS's bash 3.2 falls back to date
+if ! printf -v EPOCH '%(%s)T' -1 2>/dev/null || ! printf -v DAY '%(%Y-%m-%d)T' -1 2>/dev/null; then
+    set -- $(date '+%s %Y-%m-%d')
+    EPOCH="$1"
+    DAY="$2"
+fi
+
+# Sets VALUE to the start (at most $2 characters) of the JSON string value of
+# key $1, still escaped. The value is cut at the first quote unless $3 is
+# "raw"; raw values (prompts, which often contain escaped quotes) may run past
+# the closing quote and the reader decodes only up to it. Plain parameter
+# expansion: no regex (too slow on long prompts) and no $(...) subshell.
+field() {
+    local rest="${INPUT#*\"$1\":}"
+    VALUE=""
+    [ "$rest" = "$INPUT" ] && return
+    rest="${rest# }"
+    [ "${rest:0:1}" = '"' ] || return
+    VALUE="${rest:1:$2}"
+    [ "$3" = "raw" ] || VALUE="${VALUE%%\"*}"
+    VALUE="${VALUE//$'\t'/ }"
+    VALUE="${VALUE//$'\n'/ }"
+}
+
+field session_id 100
+SESSION="$VALUE"
+field cwd 1000
+PROJECT_DIR="${CLAUDE_PROJECT_DIR:-$VALUE}"
+PROJECT_DIR="${PROJECT_DIR//$'\t'/ }"
+PROJECT_DIR="${PROJECT_DIR//$'\n'/ }"
+TOOL=""
+FILE=""
+PREVIEW=""
+
+if [ "$EVENT" = "prompt" ]; then
+    field prompt 300 raw
+    PREVIEW="$VALUE"
+else
+    EVENT="tool"
+    field tool_name 100
+    TOOL="$VALUE"
+    case "$TOOL" in
+        Edit|MultiEdit|Write)
+            field file_path 1000
+            FILE="$VALUE"
+            ;;
+        NotebookEdit)
+            field notebook_path 1000
+            FILE="$VALUE"
+            ;;
+    esac
+fi
+
+if [ ! -d "$JOURNAL_DIR" ]; then
+    mkdir -p "$JOURNAL_DIR" || exit 0
+fi
+# Readers trust the journal only for windows after this first event
+if [ ! -e "$JOURNAL_DIR/active-since" ]; then
+    echo "$EPOCH" > "$JOURNAL_DIR/active-since"
+fi
+
+printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\n' \
+    "$EPOCH" "$SESSION" "$EVENT" "$TOOL" "$PROJECT_DIR" "$FILE" "$PREVIEW" >> "$JOURNAL_DIR/$DAY.tsv"
+
+# Never interrupt Claude Code
+exit 0
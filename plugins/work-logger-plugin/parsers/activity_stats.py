@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Columnar breakdowns of a work summary: per hour, per project and per tool.
+
+The merged summary is flattened once into typed columns, one row per
+activity and one per tool call: int64 local epoch seconds and int32 codes
+into per-column dictionaries of project, source and tool names. Histograms,
+heatmaps and top-K tables are then counts over those codes, computed with
+NumPy when it is installed (the columns are array buffers it reads without
+copying) and with plain loops over the arrays otherwise.
+"""
+
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from parsing_engine import parse_timestamp
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HOURS = 24
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+DEFAULT_TOP = 10
+BAR_WIDTH = 40
+
+
+class Dictionary:
+    """Dictionary encoding of one string column."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ActivityColumns:
+    """Activity and tool-call rows of a summary as typed columns."""
+
+    def __init__(self):
+        self.projects = Dictionary()
+        self.sources = Dictionary()
+        self.tools = Dictionary()
+        # One row per activity
+        self.local = array('q')
+        self.project = array('i')
+        self.source = array('i')
+        # One row per tool call, timed by its activity
+        self.tool_local = array('q')
+        self.tool_project = array('i')
+        self.tool = array('i')
+        # UTC offset per hour since the epoch, so DST changes are honoured
+        self._offsets: Dict[int, int] = {}
+
+    def _local_seconds(self, epoch: int) -> int:
+        hour = epoch // 3600
+        offset = self._offsets.get(hour)
+        if offset is None:
+            offset = self._offsets[hour] = time.localtime(epoch).tm_gmtoff
+        return epoch + offset
+
+    def add(self, project: str, activity: Dict[str, Any]) -> None:
+        timestamp = parse_timestamp(activity.get('timestamp'))
+        if timestamp is None:
+            return
+        local = self._local_seconds(int(timestamp.timestamp()))
+        project_code = self.projects.code(project)
+        self.local.append(local)
+        self.project.append(project_code)
+        self.source.append(self.sources.code(activity.get('source', 'unknown')))
+        for tool in activity.get('tools') or []:
+            if tool:
+                self.tool_local.append(local)
+                self.tool_project.append(project_code)
+                self.tool.append(self.tools.code(tool))
+
+    @classmethod
+    def from_summary(cls, summary: Dict[str, List[Dict[str, Any]]]) -> 'ActivityColumns':
+        columns = cls()
+        for project, activities in summary.items():
+            for activity in activities:
+                columns.add(project, activity)
+        return columns
+
+
+# --- counting kernels (NumPy or pure Python over the same arrays) -----------
+
+def _hours(local: array) -> Sequence[int]:
+    if np is not None:
+        return (np.frombuffer(local, dtype=np.int64) // 3600) % HOURS
+    return [(seconds // 3600) % HOURS for seconds in local]
+
+
+def _days(local: array) -> Sequence[int]:
+    if np is not None:
+        return np.frombuffer(local, dtype=np.int64) // 86400
+    return [seconds // 86400 for seconds in local]
+
+
+def _as_codes(codes: Any) -> Any:
+    if np is not None and isinstance(codes, array):
+        return np.frombuffer(codes, dtype=np.int32)
+    return codes
+
+
+def bincount(codes: Any, size: int) -> List[int]:
+    """Occurrences of each code in range(size)."""
+    codes = _as_codes(codes)
+    if np is not None:
+        return np.bincount(codes, minlength=size)[:size].tolist() if len(codes) else [0] * size
+    counts = [0] * size
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+
+def bincount2(rows: Any, cols: Any, n_rows: int, n_cols: int) -> List[List[int]]:
+    """Heatmap of (row code, column code) pairs as an n_rows x n_cols table."""
+    rows = _as_codes(rows)
+    cols = _as_codes(cols)
+    if np is not None:
+        if not len(rows):
+            return [[0] * n_cols for _ in range(n_rows)]
+        flat = np.asarray(rows, dtype=np.int64) * n_cols + np.asarray(cols, dtype=np.int64)
+        return np.bincount(flat, minlength=n_rows * n_cols).reshape(n_rows, n_cols).tolist()
+    table = [[0] * n_cols for _ in range(n_rows)]
+    for row, col in zip(rows, cols):
+        table[row][col] += 1
+    return table
+
+
+def distinct_per_code(codes: Any, keys: Any, size: int) -> List[int]:
+    """Number of distinct keys seen with each code (e.g. active days per project)."""
+    codes = _as_codes(codes)
+    if np is not None:
+        if not len(codes):
+            return [0] * size
+        keys = np.asarray(keys, dtype=np.int64)
+        keys = keys - keys.min()
+        span = int(keys.max()) + 1
+        pairs = np.unique(np.asarray(codes, dtype=np.int64) * span + keys)
+        return np.bincount(pairs // span, minlength=size).tolist()
+    seen = set(zip(codes, keys))
+    counts = [0] * size
+    for code, _ in seen:
+        counts[code] += 1
+    return counts
+
+
+def top_k(counts: Sequence[int], names: List[str], k: int) -> List[Tuple[str, int]]:
+    """The k largest non-zero counts with their names, largest first."""
+    ranked = sorted(range(len(counts)), key=lambda code: counts[code], reverse=True)
+    return [(names[code], counts[code]) for code in ranked[:k] if counts[code]]
+
+
+# --- report -----------------------------------------------------------------
+
+def compute_stats(columns: ActivityColumns, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """Hourly, weekday and per-project/tool/source breakdowns of the columns."""
+    n_projects = len(columns.projects)
+    n_tools = len(columns.tools)
+
+    hours = _hours(columns.local)
+    days = _days(columns.local)
+    weekdays = (days + 3) % 7 if np is not None else [(day + 3) % 7 for day in days]
+
+    project_activities = bincount(columns.project, n_projects)
+    project_tool_calls = bincount(columns.tool_project, n_projects)
+    project_days = distinct_per_code(columns.project, days, n_projects)
+    tool_counts = bincount(columns.tool, n_tools)
+
+    top_projects = top_k(project_activities, columns.projects.values, top)
+    project_hours = bincount2(columns.project, hours, n_projects, HOURS)
+    project_tools = bincount2(columns.tool_project, columns.tool, n_projects, n_tools)
+
+    first = min(columns.local) if columns.local else None
+    last = max(columns.local) if columns.local else None
+    return {
+        'activities': len(columns.local),
+        'tool_calls': len(columns.tool),
+        'first_day': _day_label(first),
+        'last_day': _day_label(last),
+        'by_hour': bincount(hours, HOURS),
+        'tool_calls_by_hour': bincount(_hours(columns.tool_local), HOURS),
+        'by_weekday_hour': bincount2(weekdays, hours, len(WEEKDAYS), HOURS),
+        'sources': top_k(bincount(columns.source, len(columns.sources)), columns.sources.values, top),
+        'tools': top_k(tool_counts, columns.tools.values, top),
+        'projects': [
+            {
+                'project': name,
+                'activities': count,
+                'tool_calls': project_tool_calls[columns.projects.codes[name]],
+                'active_days': project_days[columns.projects.codes[name]],
+                'by_hour': project_hours[columns.projects.codes[name]],
+                'top_tools': top_k(project_tools[columns.projects.codes[name]], columns.tools.values, 5),
+            }
+            for name, count in top_projects
+        ],
+        'backend': 'numpy' if np is not None else 'array',
+    }
+
+
+def _day_label(local_seconds: Optional[int]) -> Optional[str]:
+    if local_seconds is None:
+        return None
+    # Columns hold local wall-clock seconds, so format them without another offset
+    return datetime.fromtimestamp(local_seconds, timezone.utc).strftime('%Y-%m-%d')
+
+
+def _bar(count: int, peak: int) -> str:
+    return '#' * (round(count * BAR_WIDTH / peak) if peak else 0)
+
+
+def _heat(count: int, peak: int) -> str:
+    shades = ' .:-=+*#'
+    return shades[min(len(shades) - 1, -(-count * (len(shades) - 1) // peak))] if peak and count else ' '
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """Text tables and bar charts for compute_stats() output."""
+    if not stats['activities']:
+        return "No work activities found."
+
+    lines = [
+        f"=== Activity stats: {stats['first_day']} to {stats['last_day']} "
+        f"({stats['activities']} activities, {stats['tool_calls']} tool calls) ==="
+    ]
+
+    lines.append("\nBy hour of day (activities, tool calls):")
+    peak = max(stats['by_hour'])
+    for hour, (count, calls) in enumerate(zip(stats['by_hour'], stats['tool_calls_by_hour'])):
+        lines.append(f"  {hour:02d}:00 {count:>7} {calls:>8} {_bar(count, peak)}")
+
+    lines.append("\nWeekday x hour:")
+    lines.append("      " + ''.join(f"{hour:<6d}" for hour in range(0, HOURS, 3)))
+    peak = max(max(row) for row in stats['by_weekday_hour'])
+    for name, row in zip(WEEKDAYS, stats['by_weekday_hour']):
+        lines.append(f"  {name} " + ''.join(_heat(count, peak) * 2 for count in row))
+
+    lines.append("\nProjects:")
+    for entry in stats['projects']:
+        tools = ', '.join(f"{tool} {count}" for tool, count in entry['top_tools'])
+        lines.append(
+            f"  {entry['project']}: {entry['activities']} activities, {entry['tool_calls']} tool calls, "
+            f"{entry['active_days']} active days" + (f" ({tools})" if tools else '')
+        )
+
+    if stats['tools']:
+        lines.append("\nTools:")
+        peak = stats['tools'][0][1]
+        for tool, count in stats['tools']:
+            lines.append(f"  {tool:<16} {count:>8} {_bar(count, peak)}")
+
+    lines.append("\nSources: " + ', '.join(f"{source} {count}" for source, count in stats['sources']))
+    return '\n'.join(lines)
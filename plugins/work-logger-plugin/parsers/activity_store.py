@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite store of parsed activities.
+
+Activities are added as sessions are parsed (duplicates are ignored by a
+stable activity id, and a Claude prompt read from both the hook journal and
+its transcript is stored once), and every file path they touch is indexed
+together with each of its ancestor directories. That inverted index answers
+"what was done to this file or directory" without rescanning transcripts.
+Activity text is also kept in an FTS5 table for ranked full-text search,
+and closed days are summarized into daily rollup rows (see rollups.py).
+"""
+
+import hashlib
+import json
+import os
+import time
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from parsing_engine import parse_timestamp
+from session_io import session_stem
+from storage_paths import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    project TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    epoch REAL NOT NULL,
+    session_file TEXT,
+    request TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activities_epoch ON activities (epoch);
+
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS path_activities (
+    path_id INTEGER NOT NULL,
+    activity_id TEXT NOT NULL,
+    direct INTEGER NOT NULL,
+    PRIMARY KEY (path_id, activity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS path_activities_activity ON path_activities (activity_id, direct);
+
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (day, project, source)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS closed_days (
+    day TEXT NOT NULL,
+    source TEXT NOT NULL,
+    closed_at REAL NOT NULL,
+    PRIMARY KEY (day, source)
+) WITHOUT ROWID;
+"""
+
+# rowid matches activities.rowid so search results join back cheaply
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE activity_text USING fts5(
+    request, details, chain_name,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+INSERT INTO activity_text (activity_text, rank) VALUES ('rank', 'bm25(4.0, 1.0, 2.0)');
+"""
+
+MAX_DETAILS_CHARS = 2000
+
+# The hook journal stamps a prompt when the hook runs, in whole seconds; its
+# transcript entry carries the message's own millisecond timestamp
+COPY_WINDOW_SECONDS = 2
+# Leading request characters compared (the journal keeps a short preview)
+COPY_PREFIX_CHARS = 100
+
+
+def activity_id(activity: Dict[str, Any], project: str) -> str:
+    """Stable id for an activity, so re-parsing the same window is idempotent."""
+    key = '\0'.join([
+        activity.get('source', ''),
+        project,
+        activity.get('session_file') or activity.get('chain_name') or '',
+        activity.get('timestamp') or '',
+        activity.get('request', ''),
+    ])
+    return hashlib.sha1(key.encode('utf-8', 'replace')).hexdigest()[:20]
+
+
+def request_prefix(request: str) -> str:
+    """Whitespace-normalized start of a request, for matching copies of one prompt."""
+    return ' '.join(request.split())[:COPY_PREFIX_CHARS]
+
+
+def activity_details(activity: Dict[str, Any]) -> str:
+    """Secondary searchable text (e.g. Junie plans and next steps)."""
+    details = ' '.join(str(p) for p in activity.get('plans') or [])
+    return details[:MAX_DETAILS_CHARS]
+
+
+def fts_query(query: str) -> str:
+    """Quote each bare word of a query so FTS5 operators in it cannot error out."""
+    terms = []
+    for word in query.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def like_escape(text: str) -> str:
+    """Escape LIKE wildcards (used with ESCAPE '\\')."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def normalize_path(path: str, cwd: Optional[str] = None) -> Optional[str]:
+    """Normalize a file path for indexing; returns None for non-paths."""
+    if not path or not isinstance(path, str) or path.startswith('<'):
+        return None
+    path = os.path.expanduser(path.strip().replace('\\', '/'))
+    if not path.startswith('/') and cwd:
+        path = os.path.join(cwd, path)
+    path = os.path.normpath(path)
+    return path if path != '.' else None
+
+
+def path_keys(path: str) -> List[str]:
+    """The path itself followed by each of its ancestor directories."""
+    keys = [path]
+    parent = os.path.dirname(path)
+    # Stop before the filesystem root, which would match every activity
+    while parent and parent != keys[-1] and parent != '/':
+        keys.append(parent)
+        parent = os.path.dirname(parent)
+    return keys
+
+
+def activity_files(activity: Dict[str, Any]) -> List[str]:
+    """Normalized file paths an activity touched, for any source format."""
+    cwd = activity.get('cwd') or None
+    files = []
+    for item in activity.get('files') or []:
+        # Claude records dicts with 'file' (and its own cwd); others plain paths
+        if isinstance(item, dict):
+            normalized = normalize_path(item.get('file', ''), item.get('cwd') or cwd)
+        else:
+            normalized = normalize_path(str(item), cwd)
+        if normalized and normalized not in files:
+            files.append(normalized)
+    return files
+
+
+def modified_files(activity: Dict[str, Any]) -> List[str]:
+    """Normalized paths an activity changed, which is what --touched indexes.
+
+    Claude 'files' entries are all edits; Codex 'files' also lists reads, so
+    its edits come from 'modified_files'. Junie only records open files.
+    """
+    changed = [item for item in activity.get('files') or [] if isinstance(item, dict)]
+    changed.extend(activity.get('modified_files') or [])
+    return activity_files({'files': changed, 'cwd': activity.get('cwd')})
+
+
+class ActivityStore:
+    """SQLite-backed activity store with an inverted file-path index."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else data_path('activity.db')
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.has_fts = self._ensure_fts()
+
+    def _ensure_fts(self) -> bool:
+        """Create the FTS5 table if needed, backfilling existing activities."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'activity_text'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            with self.conn:
+                self.conn.executescript(FTS_SCHEMA)
+                self.conn.execute(
+                    "INSERT INTO activity_text (rowid, request, details, chain_name) "
+                    "SELECT rowid, request, '', CASE WHEN source = 'junie' THEN session_file ELSE '' END "
+                    "FROM activities"
+                )
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: the rest of the store still works
+            return False
+        return True
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'ActivityStore':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _path_id(self, path: str) -> int:
+        row = self.conn.execute('SELECT id FROM paths WHERE path = ?', (path,)).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute('INSERT INTO paths (path) VALUES (?)', (path,)).lastrowid
+
+    def add_activities(self, summary: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Add a merged summary to the store; returns the number of new activities."""
+        added = 0
+        with self.conn:
+            for project, activities in summary.items():
+                for activity in activities:
+                    timestamp = parse_timestamp(activity.get('timestamp'))
+                    if timestamp is None:
+                        continue
+
+                    aid = activity_id(activity, project)
+                    copy = self._find_copy(activity, project, timestamp.timestamp())
+                    if copy is not None:
+                        # Already stored from the other path; keep the longer text and add any new files
+                        aid = self._merge_copy(copy, activity)
+                        self._index_paths(activity, aid)
+                        continue
+
+                    cursor = self.conn.execute(
+                        'INSERT OR IGNORE INTO activities '
+                        '(id, source, project, timestamp, epoch, session_file, request) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (
+                            aid,
+                            activity.get('source', ''),
+                            project,
+                            activity['timestamp'],
+                            timestamp.timestamp(),
+                            activity.get('session_file') or activity.get('chain_name'),
+                            activity.get('request', ''),
+                        )
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    added += 1
+
+                    if self.has_fts:
+                        self.conn.execute(
+                            'INSERT INTO activity_text (rowid, request, details, chain_name) '
+                            'VALUES (?, ?, ?, ?)',
+                            (
+                                cursor.lastrowid,
+                                activity.get('request', ''),
+                                activity_details(activity),
+                                activity.get('chain_name', ''),
+                            )
+                        )
+
+                    self._index_paths(activity, aid)
+        return added
+
+    def _index_paths(self, activity: Dict[str, Any], aid: str) -> None:
+        for path in modified_files(activity):
+            for depth, key in enumerate(path_keys(path)):
+                self.conn.execute(
+                    'INSERT OR IGNORE INTO path_activities (path_id, activity_id, direct) '
+                    'VALUES (?, ?, ?)',
+                    (self._path_id(key), aid, 1 if depth == 0 else 0)
+                )
+
+    def _find_copy(self, activity: Dict[str, Any], project: str, epoch: float) -> Optional[Tuple[str, int, str]]:
+        """(id, rowid, request) of a stored copy of this session request, if any.
+
+        Activity ids hash the exact timestamp and request text, which differ
+        between the journal and the transcript of one prompt, so copies are
+        matched on session, a few seconds of clock and the start of the request.
+        Junie activities (no session_file) are identified by their id alone.
+        """
+        session_file = activity.get('session_file')
+        if not session_file:
+            return None
+        stem = session_stem(Path(session_file))
+        prefix = request_prefix(activity.get('request', ''))
+        rows = self.conn.execute(
+            'SELECT id, rowid, session_file, request FROM activities '
+            'WHERE epoch BETWEEN ? AND ? AND source = ? AND project = ?',
+            (epoch - COPY_WINDOW_SECONDS, epoch + COPY_WINDOW_SECONDS, activity.get('source', ''), project)
+        )
+        for aid, rowid, stored_file, request in rows:
+            if not stored_file or session_stem(Path(stored_file)) != stem:
+                continue
+            stored = request_prefix(request)
+            common = min(len(stored), len(prefix))
+            if stored[:common] == prefix[:common]:
+                return aid, rowid, request
+        return None
+
+    def _merge_copy(self, copy: Tuple[str, int, str], activity: Dict[str, Any]) -> str:
+        aid, rowid, stored_request = copy
+        request = activity.get('request', '')
+        if len(request) > len(stored_request):
+            self.conn.execute('UPDATE activities SET request = ? WHERE id = ?', (request, aid))
+            if self.has_fts:
+                self.conn.execute('UPDATE activity_text SET request = ? WHERE rowid = ?', (request, rowid))
+        return aid
+
+    def _matching_path_ids(self, query: str) -> List[int]:
+        """Ids of indexed paths equal to the query, or ending with it when relative."""
+        stripped = query.strip().replace('\\', '/').rstrip('/') or '/'
+        if os.path.isabs(os.path.expanduser(stripped)):
+            normalized = normalize_path(stripped)
+            row = self.conn.execute('SELECT id FROM paths WHERE path = ?', (normalized,)).fetchone()
+            return [row[0]] if row else []
+
+        # Relative query: try it against the current directory first,
+        # then fall back to a suffix match over the (small) paths table
+        normalized = normalize_path(stripped, os.getcwd())
+        row = self.conn.execute('SELECT id FROM paths WHERE path = ?', (normalized,)).fetchone()
+        if row:
+            return [row[0]]
+
+        suffix = os.path.normpath(stripped)
+        rows = self.conn.execute(
+            "SELECT id FROM paths WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+            (suffix, '%/' + like_escape(suffix))
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def touched(self, query: str, since_epoch: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Activities that touched a file, or anything under a directory, newest first."""
+        path_ids = self._matching_path_ids(query)
+        if not path_ids:
+            return []
+
+        placeholders = ','.join('?' * len(path_ids))
+        sql = (
+            'SELECT DISTINCT a.id, a.source, a.project, a.timestamp, a.epoch, a.session_file, a.request '
+            'FROM path_activities pa JOIN activities a ON a.id = pa.activity_id '
+            f'WHERE pa.path_id IN ({placeholders})'
+        )
+        params: List[Any] = list(path_ids)
+        if since_epoch is not None:
+            sql += ' AND a.epoch >= ?'
+            params.append(since_epoch)
+        sql += ' ORDER BY a.epoch DESC'
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            results.append({
+                'id': row[0],
+                'source': row[1],
+                'project': row[2],
+                'timestamp': row[3],
+                'session_file': row[5],
+                'request': row[6],
+                'files': [],
+            })
+        if not results:
+            return results
+
+        # Attach the directly touched files that fall under the matched paths
+        matched = [
+            r[0] for r in self.conn.execute(
+                f'SELECT path FROM paths WHERE id IN ({placeholders})', path_ids
+            )
+        ]
+        by_id = {r['id']: r for r in results}
+        ids = list(by_id)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.conn.execute(
+                'SELECT pa.activity_id, p.path FROM path_activities pa JOIN paths p ON p.id = pa.path_id '
+                f'WHERE pa.direct = 1 AND pa.activity_id IN ({",".join("?" * len(chunk))})',
+                chunk
+            )
+            for aid, path in rows:
+                if any(path == m or path.startswith(m.rstrip('/') + '/') for m in matched):
+                    by_id[aid]['files'].append(path)
+        return results
+
+    def search(
+        self,
+        query: str,
+        project: Optional[str] = None,
+        source: Optional[str] = None,
+        since_epoch: Optional[float] = None,
+        until_epoch: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Ranked full-text search over stored activities.
+
+        Supports FTS5 syntax ("exact phrase", prefix*, AND/OR/NOT); a query
+        that FTS5 cannot parse is retried with every word quoted.
+        """
+        if not self.has_fts:
+            raise RuntimeError('This SQLite build has no FTS5 support')
+
+        sql = (
+            'SELECT a.id, a.source, a.project, a.timestamp, a.session_file, a.request, '
+            "       snippet(activity_text, -1, '[', ']', '...', 12) "
+            'FROM activity_text JOIN activities a ON a.rowid = activity_text.rowid '
+            'WHERE activity_text MATCH ?'
+        )
+        params: List[Any] = []
+        if project:
+            sql += " AND a.project LIKE ? ESCAPE '\\'"
+            params.append('%' + like_escape(project) + '%')
+        if source:
+            sql += ' AND a.source = ?'
+            params.append(source)
+        if since_epoch is not None:
+            sql += ' AND a.epoch >= ?'
+            params.append(since_epoch)
+        if until_epoch is not None:
+            sql += ' AND a.epoch < ?'
+            params.append(until_epoch)
+        sql += ' ORDER BY activity_text.rank LIMIT ?'
+
+        try:
+            rows = self.conn.execute(sql, [query] + params + [limit]).fetchall()
+        except sqlite3.OperationalError:
+            rows = self.conn.execute(sql, [fts_query(query)] + params + [limit]).fetchall()
+
+        return [
+            {
+                'id': row[0],
+                'source': row[1],
+                'project': row[2],
+                'timestamp': row[3],
+                'session_file': row[4],
+                'request': row[5],
+                'snippet': row[6],
+            }
+            for row in rows
+        ]
+
+    def closed_days(self, days: List[str], sources: List[str]) -> Dict[str, set]:
+        """Days (ISO dates) already rolled up, per source."""
+        closed: Dict[str, set] = {source: set() for source in sources}
+        if not days or not sources:
+            return closed
+        rows = self.conn.execute(
+            'SELECT day, source FROM closed_days WHERE day BETWEEN ? AND ? '
+            f'AND source IN ({",".join("?" * len(sources))})',
+            [min(days), max(days)] + list(sources)
+        )
+        for day, source in rows:
+            closed[source].add(day)
+        return closed
+
+    def close_days(self, rollups: List[Dict[str, Any]], days: List[str], sources: List[str]) -> None:
+        """Store the rollups of fully parsed days and mark those days closed."""
+        if not days or not sources:
+            return
+        now = time.time()
+        with self.conn:
+            for day in days:
+                for source in sources:
+                    self.conn.execute(
+                        'DELETE FROM daily_rollups WHERE day = ? AND source = ?', (day, source)
+                    )
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO closed_days (day, source, closed_at) VALUES (?, ?, ?)',
+                        (day, source, now)
+                    )
+            for rollup in rollups:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO daily_rollups (day, project, source, data) VALUES (?, ?, ?, ?)',
+                    (rollup['day'], rollup['project'], rollup['source'], json.dumps(rollup))
+                )
+
+    def load_rollups(self, first_day: str, last_day: str, sources: List[str]) -> List[Dict[str, Any]]:
+        """Stored rollup rows between two ISO dates (inclusive) for the given sources."""
+        if not sources:
+            return []
+        rows = self.conn.execute(
+            'SELECT data FROM daily_rollups WHERE day BETWEEN ? AND ? '
+            f'AND source IN ({",".join("?" * len(sources))})',
+            [first_day, last_day] + list(sources)
+        )
+        return [json.loads(row[0]) for row in rows]
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Per-user activity bundles and the team merge over them.
+
+A bundle is one file: a magic string, a JSON header and one compressed
+section per local day. The header lists every day's byte range, activity
+count and projects, so a reader can pick days and projects without
+decompressing anything else. Each section is columnar: delta-encoded
+millisecond timestamps, indices into a per-section string table for
+projects, sources, tools and files, and the bounded request previews.
+
+Sections are time-ordered and days are written in order, so every bundle
+reads as a sorted stream; the team merge is a k-way heap merge of those
+streams, which never holds more than one decoded day per bundle.
+"""
+
+import heapq
+import json
+import os
+import struct
+import zlib
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from activity_store import activity_files
+from parsing_engine import parse_timestamp
+from rollups import MAX_TOP_REQUESTS, local_day
+
+BUNDLE_MAGIC = b'WLBUNDLE'
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = '.wlb'
+COMPRESSION_LEVEL = 6
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+class BundleActivity(NamedTuple):
+    """One activity read back from a bundle."""
+    epoch_ms: int
+    user: str
+    project: str
+    source: str
+    request: str
+    tools: List[str]
+    files: List[str]
+
+
+def encode_day(rows: List[Dict[str, Any]]) -> bytes:
+    """Compress one day of time-sorted rows into a columnar section."""
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    times = []
+    previous = 0
+    for row in rows:
+        times.append(row['epoch_ms'] - previous)
+        previous = row['epoch_ms']
+
+    columns = {
+        'time': times,
+        'project': [intern(row['project']) for row in rows],
+        'source': [intern(row['source']) for row in rows],
+        'request': [row['request'] for row in rows],
+        'tools': [[intern(tool) for tool in row['tools']] for row in rows],
+        'files': [[intern(path) for path in row['files']] for row in rows],
+        'strings': strings,
+    }
+    return zlib.compress(json.dumps(columns, separators=(',', ':')).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decode_day(section: bytes, user: str) -> Iterator[BundleActivity]:
+    """Yield the activities of a compressed section in time order."""
+    columns = json.loads(zlib.decompress(section))
+    strings = columns['strings']
+    epoch_ms = 0
+    for position, delta in enumerate(columns['time']):
+        epoch_ms += delta
+        yield BundleActivity(
+            epoch_ms,
+            user,
+            strings[columns['project'][position]],
+            strings[columns['source'][position]],
+            columns['request'][position],
+            [strings[i] for i in columns['tools'][position]],
+            [strings[i] for i in columns['files'][position]],
+        )
+
+
+def write_bundle(path: Path, summary: Dict[str, List[Dict[str, Any]]], user: str) -> Dict[str, Any]:
+    """Write a merged summary as a bundle for one user and return its header."""
+    days: Dict[str, List[Dict[str, Any]]] = {}
+    for project, activities in summary.items():
+        for activity in activities:
+            timestamp = parse_timestamp(activity.get('timestamp'))
+            if timestamp is None:
+                continue
+            days.setdefault(local_day(timestamp), []).append({
+                'epoch_ms': int(timestamp.timestamp() * 1000),
+                'project': project,
+                'source': activity.get('source', 'unknown'),
+                'request': activity.get('request', ''),
+                'tools': [tool for tool in activity.get('tools') or [] if tool],
+                'files': activity_files(activity),
+            })
+
+    sections = []
+    index = []
+    offset = 0
+    for day in sorted(days):
+        rows = sorted(days[day], key=lambda row: row['epoch_ms'])
+        section = encode_day(rows)
+        sections.append(section)
+        index.append({
+            'day': day,
+            'offset': offset,
+            'length': len(section),
+            'count': len(rows),
+            'projects': sorted({row['project'] for row in rows}),
+        })
+        offset += len(section)
+
+    header = {
+        'format': 'work-logger-bundle',
+        'version': BUNDLE_VERSION,
+        'user': user,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'activities': sum(entry['count'] for entry in index),
+        'days': index,
+    }
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    tmp_path = Path(path).with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for section in sections:
+            f.write(section)
+    tmp_path.replace(path)
+    return header
+
+
+class BundleReader:
+    """Read the header of a bundle and decode only the day sections asked for."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+                raise ValueError(f"{self.path} is not a work logger bundle")
+            try:
+                (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+                self.header = json.loads(f.read(header_length))
+            except (struct.error, ValueError):
+                raise ValueError(f"{self.path} is truncated or corrupt (unreadable header)")
+            self.data_start = f.tell()
+            data_length = os.fstat(f.fileno()).st_size - self.data_start
+        if not isinstance(self.header, dict) or not isinstance(self.header.get('days'), list):
+            raise ValueError(f"{self.path} is truncated or corrupt (no day index)")
+        # A bundle cut short loses its last sections first
+        if not all(
+            isinstance(entry, dict) and isinstance(entry.get('offset'), int) and isinstance(entry.get('length'), int)
+            and entry['offset'] + entry['length'] <= data_length
+            for entry in self.header['days']
+        ):
+            raise ValueError(f"{self.path} is truncated or corrupt (day sections missing)")
+        if self.header.get('version', 0) > BUNDLE_VERSION:
+            raise ValueError(
+                f"{self.path} is bundle version {self.header.get('version')}; "
+                f"this reader supports up to {BUNDLE_VERSION}"
+            )
+        self.user = self.header.get('user', self.path.stem)
+
+    def select_days(
+        self,
+        first_day: Optional[str] = None,
+        last_day: Optional[str] = None,
+        project: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Index entries of the days in range (and holding a matching project)."""
+        selected = []
+        for entry in self.header['days']:
+            if first_day and entry['day'] < first_day:
+                continue
+            if last_day and entry['day'] > last_day:
+                continue
+            if project and not any(project.lower() in p.lower() for p in entry['projects']):
+                continue
+            selected.append(entry)
+        return selected
+
+    def iter_activities(
+        self,
+        first_day: Optional[str] = None,
+        last_day: Optional[str] = None,
+        project: Optional[str] = None
+    ) -> Iterator[BundleActivity]:
+        """Yield activities of the selected days in time order, one decoded day at a time."""
+        with open(self.path, 'rb') as f:
+            for entry in self.select_days(first_day, last_day, project):
+                f.seek(self.data_start + entry['offset'])
+                try:
+                    day = list(decode_day(f.read(entry['length']), self.user))
+                except (zlib.error, ValueError, KeyError, IndexError, TypeError):
+                    raise ValueError(f"{self.path} has a corrupt section for {entry['day']}")
+                for activity in day:
+                    if project and project.lower() not in activity.project.lower():
+                        continue
+                    yield activity
+
+
+def merge_bundles(
+    readers: Iterable[BundleReader],
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None,
+    project: Optional[str] = None
+) -> Iterator[BundleActivity]:
+    """K-way merge of several bundles into one time-ordered stream."""
+    streams = [reader.iter_activities(first_day, last_day, project) for reader in readers]
+    return heapq.merge(*streams, key=lambda activity: activity.epoch_ms)
+
+
+def team_report(activities: Iterable[BundleActivity]) -> Dict[str, Dict[str, Any]]:
+    """Combine a merged stream into one report entry per project."""
+    report: Dict[str, Dict[str, Any]] = {}
+    for activity in activities:
+        entry = report.get(activity.project)
+        if entry is None:
+            entry = report[activity.project] = {
+                'activities': 0,
+                'by_user': Counter(),
+                'tools': Counter(),
+                'files': set(),
+                'first': activity.epoch_ms,
+                'last': activity.epoch_ms,
+                'top_requests': [],
+            }
+        entry['activities'] += 1
+        entry['by_user'][activity.user] += 1
+        entry['tools'].update(activity.tools)
+        entry['files'].update(activity.files)
+        # The stream is time-ordered, so the latest activity is always the last seen
+        entry['last'] = activity.epoch_ms
+
+        weight = len(activity.tools) + 2 * len(activity.files)
+        text = activity.request.strip()[:150]
+        if text:
+            top = entry['top_requests']
+            heapq.heappush(top, (weight, activity.epoch_ms, activity.user, text))
+            if len(top) > MAX_TOP_REQUESTS * 4:
+                heapq.heappop(top)
+    return report
+
+
+def format_team_report(report: Dict[str, Dict[str, Any]], users: List[str]) -> str:
+    """Format a team report built by team_report()."""
+    def local(epoch_ms: int, fmt: str = '%Y-%m-%d %H:%M') -> str:
+        return datetime.fromtimestamp(epoch_ms / 1000).strftime(fmt)
+
+    total = sum(entry['activities'] for entry in report.values())
+    first = min(entry['first'] for entry in report.values())
+    last = max(entry['last'] for entry in report.values())
+    lines = [
+        f"=== Team report: {local(first, '%Y-%m-%d')} to {local(last, '%Y-%m-%d')} "
+        f"({len(users)} people, {total} activities) ==="
+    ]
+
+    ordered = sorted(report.items(), key=lambda item: item[1]['activities'], reverse=True)
+    for project, entry in ordered:
+        by_user = ', '.join(f"{user} {count}" for user, count in entry['by_user'].most_common())
+
+        lines.append(f"\n=== {project} ===\n")
+        lines.append(f"Activities: {entry['activities']} ({by_user})")
+        lines.append(f"First/last: {local(entry['first'])} -> {local(entry['last'])}")
+        if entry['tools']:
+            tools = ', '.join(f"{tool} ({count})" for tool, count in entry['tools'].most_common(8))
+            lines.append(f"Tools: {tools}")
+        lines.append(f"Files touched: {len(entry['files'])}")
+
+        seen = set()
+        top = []
+        for _, _, user, text in sorted(entry['top_requests'], reverse=True):
+            if text.lower() not in seen:
+                seen.add(text.lower())
+                top.append(f"- [{user}] {text[:100]}")
+        if top:
+            lines.append("Top requests:")
+            lines.extend(top[:MAX_TOP_REQUESTS])
+
+    return '\n'.join(lines)
+
+
+def format_team_log(activities: Iterable[BundleActivity], limit: Optional[int] = None) -> str:
+    """Chronological team timeline, optionally only the last limit activities."""
+    if limit:
+        activities = deque(activities, maxlen=limit)
+
+    lines = []
+    for activity in activities:
+        when = datetime.fromtimestamp(activity.epoch_ms / 1000).strftime('%Y-%m-%d %H:%M')
+        lines.append(f"[{when}] {activity.user} [{activity.source.upper()}] {activity.project}: {activity.request[:100]}")
+    return '\n'.join(lines)
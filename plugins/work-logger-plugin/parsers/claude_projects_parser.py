@@ -4,19 +4,45 @@ Parser for Claude Code project sessions stored in ~/.claude/projects/
 Extracts work activities from conversation history.
 """
 
-import json
-import os
+from bisect import bisect_right
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Union
 
+from parsing_engine import (
+    LOCATOR_KEY, BaseSessionParser, SessionUnit, bound_text, make_locator, parse_timestamp, read_jsonl_record,
+    scan_roots
+)
+from session_io import select_session_files
 
-class ClaudeProjectsParser:
+# Tool input fields needed downstream; everything else (file contents,
+# patches, prompts for sub-agents) is dropped when entries are compacted
+KEPT_TOOL_INPUT_KEYS = ('file_path', 'notebook_path', 'path', 'command', 'pattern')
+
+
+class ClaudeProjectsParser(BaseSessionParser):
     """Parse Claude Code project sessions to extract work activities."""
 
-    def __init__(self, projects_dir: str = "~/.claude/projects"):
-        self.projects_dir = Path(projects_dir).expanduser()
+    source_name = 'claude'
+    work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
+    personal_indicators = ['claude', 'mcp', 'config', 'plugin']
+    trivial_patterns = [
+        'settings.json',
+        '.run.xml',
+        'configuration',
+        'typo',
+        'console.log',
+        'formatting',
+        'rename',
+        '.gitignore',
+        'helper script',
+        'utility script'
+    ]
+
+    def __init__(self, projects_dir: Union[str, List[str]] = "~/.claude/projects"):
+        roots = [projects_dir] if isinstance(projects_dir, str) else projects_dir
+        self.projects_dirs = [Path(root).expanduser() for root in roots]
+        self.projects_dir = self.projects_dirs[0] if self.projects_dirs else Path()
 
     def get_project_name(self, project_dir: str) -> str:
         """Extract human-readable project name from directory name."""
@@ -28,80 +54,107 @@ class ClaudeProjectsParser:
             return '-'.join(parts[idx+1:]) if idx + 1 < len(parts) else project_dir
         return project_dir
 
-    def is_work_project(self, project_name: str) -> bool:
-        """Determine if a project is work-related based on naming patterns."""
-        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
-        personal_indicators = ['claude', 'mcp', 'config', 'plugin']
-
-        project_lower = project_name.lower()
-
-        # Exclude personal/config projects
-        if any(indicator in project_lower for indicator in personal_indicators):
-            return False
-
-        # Include work projects
-        if any(indicator in project_lower for indicator in work_indicators):
-            return True
+    def get_text_parts(self, message: Dict[str, Any]) -> List[str]:
+        """Text items of a message's content."""
+        text_parts = []
+        for item in message.get('content', []):
+            if isinstance(item, dict) and item.get('type') == 'text':
+                text_parts.append(item.get('text', ''))
+        return text_parts
+
+    def request_from_entry(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The user request an entry carries, or None for tool results and other entries.
+
+        Request text is a bounded preview; 'locator' records where the full
+        body can be re-read when it was truncated.
+        """
+        if entry.get('type') != 'user' or 'message' not in entry:
+            return None
+        message = entry['message']
+        if not isinstance(message, dict) or message.get('role') != 'user':
+            return None
+
+        # Extract text from content
+        text_parts = self.get_text_parts(message)
+        if not text_parts:
+            return None
+
+        text, truncated = bound_text(' '.join(text_parts))
+        locator = entry.get(LOCATOR_KEY)
+        if truncated and locator:
+            locator['truncated'] = True
+        return {
+            'timestamp': entry.get('timestamp'),
+            'text': text,
+            'cwd': entry.get('cwd', ''),
+            'locator': locator
+        }
+
+    def tool_uses_from_entry(self, entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Tool uses of an assistant entry."""
+        if entry.get('type') != 'assistant' or 'message' not in entry:
+            return []
+        message = entry['message']
+        if not isinstance(message, dict):
+            return []
 
-        # Default to including if uncertain
-        return True
-
-    def parse_jsonl_file(self, filepath: Path) -> List[Dict[str, Any]]:
-        """Parse a JSONL file and return list of entries."""
-        entries = []
-        try:
-            with open(filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            entries.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
-        except FileNotFoundError:
-            pass
-        return entries
+        tool_uses = []
+        for item in message.get('content', []):
+            if isinstance(item, dict) and item.get('type') == 'tool_use':
+                tool_uses.append({
+                    'timestamp': entry.get('timestamp'),
+                    'tool': item.get('name'),
+                    'input': item.get('input', {}),
+                    'cwd': entry.get('cwd', '')
+                })
+        return tool_uses
 
     def extract_user_requests(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract user requests and their timestamps from session entries."""
         requests = []
         for entry in entries:
-            if entry.get('type') == 'user' and 'message' in entry:
-                message = entry['message']
-                if isinstance(message, dict) and message.get('role') == 'user':
-                    content = message.get('content', [])
-                    # Extract text from content
-                    text_parts = []
-                    for item in content:
-                        if isinstance(item, dict) and item.get('type') == 'text':
-                            text_parts.append(item.get('text', ''))
-
-                    if text_parts:
-                        requests.append({
-                            'timestamp': entry.get('timestamp'),
-                            'text': ' '.join(text_parts),
-                            'cwd': entry.get('cwd', '')
-                        })
+            request = self.request_from_entry(entry)
+            if request:
+                requests.append(request)
         return requests
 
     def extract_tool_uses(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract tool uses from assistant messages."""
         tool_uses = []
         for entry in entries:
-            if entry.get('type') == 'assistant' and 'message' in entry:
-                message = entry['message']
-                if isinstance(message, dict):
-                    content = message.get('content', [])
-                    for item in content:
-                        if isinstance(item, dict) and item.get('type') == 'tool_use':
-                            tool_uses.append({
-                                'timestamp': entry.get('timestamp'),
-                                'tool': item.get('name'),
-                                'input': item.get('input', {}),
-                                'cwd': entry.get('cwd', '')
-                            })
+            tool_uses.extend(self.tool_uses_from_entry(entry))
         return tool_uses
 
+    def extract_turns(self, entries: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split entries into user turns in one pass over the uuid/parentUuid chain.
+
+        A user request opens a turn; every other entry belongs to the turn of
+        its parent message, looked up in a map keyed by message uuid. Each
+        tool use is tagged with the index of its request in 'turn', or None
+        when its chain does not reach an in-window request.
+        """
+        requests: List[Dict[str, Any]] = []
+        tool_uses: List[Dict[str, Any]] = []
+        turn_of: Dict[str, Optional[int]] = {}
+
+        for entry in entries:
+            request = self.request_from_entry(entry)
+            if request:
+                turn = len(requests)
+                requests.append(request)
+            else:
+                turn = turn_of.get(entry.get('parentUuid'))
+
+            uuid = entry.get('uuid')
+            if uuid:
+                turn_of[uuid] = turn
+
+            for tool_use in self.tool_uses_from_entry(entry):
+                tool_use['turn'] = turn
+                tool_uses.append(tool_use)
+
+        return requests, tool_uses
+
     def extract_file_modifications(self, tool_uses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract file modification activities from tool uses."""
         modifications = []
@@ -122,23 +175,8 @@ class ClaudeProjectsParser:
 
     def is_trivial_activity(self, request_text: str, tool_uses: List[Dict[str, Any]]) -> bool:
         """Determine if an activity is trivial based on content."""
-        trivial_patterns = [
-            'settings.json',
-            '.run.xml',
-            'configuration',
-            'typo',
-            'console.log',
-            'formatting',
-            'rename',
-            '.gitignore',
-            'helper script',
-            'utility script'
-        ]
-
-        request_lower = request_text.lower()
-
         # Check request text
-        if any(pattern in request_lower for pattern in trivial_patterns):
+        if self.matches_trivial_pattern(request_text):
             return True
 
         # Check if only reading files
@@ -147,91 +185,155 @@ class ClaudeProjectsParser:
 
         return False
 
-    def parse_project_sessions(self, project_dir: Path, since: datetime) -> List[Dict[str, Any]]:
-        """Parse all session files in a project directory since a given datetime."""
-        activities = []
+    # --- engine stages ----------------------------------------------------
 
+    def discover_project(self, project_dir: Path) -> List[SessionUnit]:
+        """List the main session files of one project directory."""
         if not project_dir.exists():
-            return activities
-
-        # Get all .jsonl files
-        for jsonl_file in project_dir.glob('*.jsonl'):
-            # Skip agent files, focus on main sessions
-            if jsonl_file.name.startswith('agent-'):
-                continue
-
-            entries = self.parse_jsonl_file(jsonl_file)
-
-            # Filter entries by timestamp
-            filtered_entries = []
-            for entry in entries:
-                timestamp_str = entry.get('timestamp')
-                if timestamp_str:
-                    try:
-                        entry_time = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        if entry_time >= since:
-                            filtered_entries.append(entry)
-                    except (ValueError, AttributeError):
-                        continue
-
-            if not filtered_entries:
-                continue
-
-            # Extract user requests and tool uses
-            requests = self.extract_user_requests(filtered_entries)
-            tool_uses = self.extract_tool_uses(filtered_entries)
-
-            # Combine into activities
-            for request in requests:
-                # Find related tool uses (within 5 minutes)
-                request_time = datetime.fromisoformat(request['timestamp'].replace('Z', '+00:00'))
-                related_tools = [
-                    t for t in tool_uses
-                    if abs((datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) - request_time).total_seconds()) < 300
-                ]
-
-                # Skip trivial activities
-                if self.is_trivial_activity(request['text'], related_tools):
-                    continue
-
-                file_mods = self.extract_file_modifications(related_tools)
-                activities.append({
-                    'timestamp': request['timestamp'],
-                    'request': request['text'],
-                    'tools': [t['tool'] for t in related_tools],
-                    'files': file_mods,
-                    'session_file': jsonl_file.name
-                })
-
-        return activities
-
-    def get_work_summary(self, since_hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
-        """Get work summary from all projects since the given number of hours ago."""
-        from datetime import timezone
-        since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
-        summary = defaultdict(list)
+            return []
+
+        project_name = self.get_project_name(project_dir.name)
+        # Skip agent files, focus on main sessions (plain or rotated archives)
+        return [
+            SessionUnit(jsonl_file, project_name)
+            for jsonl_file in select_session_files(project_dir.glob('*.jsonl*'), '.jsonl')
+            if not jsonl_file.name.startswith('agent-')
+        ]
 
-        if not self.projects_dir.exists():
-            return dict(summary)
+    def discover_root(self, projects_dir: Path) -> List[SessionUnit]:
+        """Find session files across the project directories of one root."""
+        units = []
+        if not projects_dir.exists():
+            return units
 
-        # Iterate through all project directories
-        for project_dir in self.projects_dir.iterdir():
+        for project_dir in projects_dir.iterdir():
             if not project_dir.is_dir() or project_dir.name.startswith('.'):
                 continue
-
-            project_name = self.get_project_name(project_dir.name)
-
-            # Skip non-work projects
-            if not self.is_work_project(project_name):
+            # Skip non-work projects before listing their files
+            if not self.is_work_project(self.get_project_name(project_dir.name)):
                 continue
+            units.extend(self.discover_project(project_dir))
+        return units
+
+    def discover(self, since: datetime) -> List[SessionUnit]:
+        """Find session files across all project directories of every root."""
+        return scan_roots(self.projects_dirs, self.discover_root)
+
+    def compact_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep bounded text previews and tool names/paths; drop tool results and bodies."""
+        message = entry.get('message')
+        if not isinstance(message, dict):
+            return entry
+
+        content = message.get('content')
+        locator = entry.get(LOCATOR_KEY)
+        if isinstance(content, str):
+            content = bound_text(content)[0]
+        elif isinstance(content, list):
+            compacted = []
+            for item in content:
+                if not isinstance(item, dict):
+                    continue
+                if item.get('type') == 'text':
+                    text, truncated = bound_text(item.get('text', ''))
+                    if truncated and locator:
+                        locator['truncated'] = True
+                    compacted.append({'type': 'text', 'text': text})
+                elif item.get('type') == 'tool_use':
+                    tool_input = item.get('input', {})
+                    if isinstance(tool_input, dict):
+                        tool_input = {
+                            k: bound_text(v)[0] if isinstance(v, str) else v
+                            for k, v in tool_input.items() if k in KEPT_TOOL_INPUT_KEYS
+                        }
+                    compacted.append({'type': 'tool_use', 'name': item.get('name'), 'input': tool_input})
+            content = compacted
+
+        entry['message'] = {'role': message.get('role'), 'content': content}
+        return entry
+
+    def extract(
+        self,
+        entries: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        return self.extract_turns(entries)
+
+    def correlate(
+        self,
+        requests: List[Dict[str, Any]],
+        tool_uses: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Give each tool use to exactly one request: the turn it belongs to.
+
+        Tool uses without a turn (sessions without message ids, or a chain
+        broken by a malformed line) go to the latest earlier request within
+        the correlation window instead of every request near them.
+        """
+        assigned: List[List[int]] = [[] for _ in requests]
+        orphans = []
+        for index, tool_use in enumerate(tool_uses):
+            if tool_use.get('turn') is not None:
+                assigned[tool_use['turn']].append(index)
+            else:
+                orphans.append(index)
+
+        if orphans:
+            timed = sorted(
+                (timestamp, position) for position, request in enumerate(requests)
+                for timestamp in [parse_timestamp(request.get('timestamp'))] if timestamp is not None
+            )
+            times = [timestamp for timestamp, _ in timed]
+            window = timedelta(seconds=self.correlation_window_seconds)
+            for index in orphans:
+                tool_time = parse_timestamp(tool_uses[index].get('timestamp'))
+                if tool_time is None:
+                    continue
+                position = bisect_right(times, tool_time) - 1
+                if position >= 0 and tool_time - times[position] <= window:
+                    assigned[timed[position][1]].append(index)
 
-            # Parse sessions
-            activities = self.parse_project_sessions(project_dir, since)
+        return [
+            (request, [tool_uses[i] for i in sorted(indices)])
+            for request, indices in zip(requests, assigned)
+        ]
 
-            if activities:
-                summary[project_name].extend(activities)
+    def load_request_body(self, locator: Dict[str, Any]) -> Optional[str]:
+        """Re-read the full text of a truncated request from its session file."""
+        entry = read_jsonl_record(Path(locator['file']), locator['offset'], locator['length'])
+        if not isinstance(entry, dict) or not isinstance(entry.get('message'), dict):
+            return None
+        text_parts = self.get_text_parts(entry['message'])
+        return ' '.join(text_parts) if text_parts else None
+
+    def classify(self, request: Dict[str, Any], tool_uses: List[Dict[str, Any]]) -> bool:
+        return not self.is_trivial_activity(request['text'], tool_uses)
+
+    def emit(
+        self,
+        request: Dict[str, Any],
+        tool_uses: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Dict[str, Any]:
+        activity = {
+            'timestamp': request['timestamp'],
+            'request': request['text'],
+            'tools': [t['tool'] for t in tool_uses],
+            'files': self.extract_file_modifications(tool_uses),
+            'session_file': unit.path.name
+        }
+        locator = make_locator(unit.path, request.get('locator'))
+        if locator:
+            activity['request_locator'] = locator
+        return activity
 
-        return dict(summary)
+    def parse_project_sessions(self, project_dir: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse all session files in a project directory since a given datetime."""
+        engine = self.create_engine()
+        activities = []
+        for unit in self.discover_project(project_dir):
+            activities.extend(engine.parse_unit(unit, since))
+        return activities
 
 
 def main():
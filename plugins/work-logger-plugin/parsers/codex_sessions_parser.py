@@ -5,34 +5,48 @@ Extracts work activities from Codex conversation history.
 """
 
 import json
-import os
 from pathlib import Path
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Union
 
+from parsing_engine import (
+    LOCATOR_KEY, BaseSessionParser, SessionUnit, bound_text, make_locator, read_jsonl_record, scan_roots
+)
+from session_io import select_session_files
 
-class CodexSessionsParser:
+IDE_CONTEXT_PREFIX = '# Context from my IDE setup:'
+IDE_REQUEST_MARKER = '## My request for Codex:'
+
+# Function-call arguments needed downstream; patches and file bodies are dropped
+KEPT_ARGUMENT_KEYS = ('path', 'file_path', 'command')
+
+
+class CodexSessionsParser(BaseSessionParser):
     """Parse Codex sessions to extract work activities."""
 
-    def __init__(self, sessions_dir: str = "~/.codex/sessions"):
-        self.sessions_dir = Path(sessions_dir).expanduser()
-
-    def parse_jsonl_file(self, filepath: Path) -> List[Dict[str, Any]]:
-        """Parse a JSONL file and return list of entries."""
-        entries = []
-        try:
-            with open(filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            entries.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
-        except FileNotFoundError:
-            pass
-        return entries
+    source_name = 'codex'
+    work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
+    personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles']
+    trivial_patterns = [
+        'settings.json',
+        '.run.xml',
+        'configuration',
+        'typo',
+        'console.log',
+        'formatting',
+        'rename',
+        '.gitignore',
+        'helper script',
+        'utility script',
+        'ls -la',
+        'cd ',
+        'pwd'
+    ]
+
+    def __init__(self, sessions_dir: Union[str, List[str]] = "~/.codex/sessions"):
+        roots = [sessions_dir] if isinstance(sessions_dir, str) else sessions_dir
+        self.sessions_dirs = [Path(root).expanduser() for root in roots]
+        self.sessions_dir = self.sessions_dirs[0] if self.sessions_dirs else Path()
 
     def extract_project_from_cwd(self, cwd: str) -> str:
         """Extract project name from working directory."""
@@ -49,49 +63,42 @@ class CodexSessionsParser:
         # Fallback to last directory
         return path_parts[-1] if path_parts else "unknown"
 
-    def is_work_project(self, project_name: str) -> bool:
-        """Determine if a project is work-related based on naming patterns."""
-        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
-        personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles']
-
-        project_lower = project_name.lower()
-
-        # Exclude personal/config projects
-        if any(indicator in project_lower for indicator in personal_indicators):
-            return False
-
-        # Include work projects
-        if any(indicator in project_lower for indicator in work_indicators):
-            return True
-
-        # Default to including if uncertain
-        return True
+    def get_request_text(self, message_text: str) -> Optional[str]:
+        """Actual user request in a message, or None for a bare IDE context message."""
+        # Skip IDE context messages
+        if message_text.startswith(IDE_CONTEXT_PREFIX):
+            # Extract actual user request
+            if IDE_REQUEST_MARKER in message_text:
+                return message_text.split(IDE_REQUEST_MARKER)[1].strip()
+            return None
+        return message_text
 
     def extract_user_messages(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract user messages from session entries."""
+        """Extract user messages from session entries.
+
+        Message text is a bounded preview; 'locator' records where the full
+        body can be re-read when it was truncated.
+        """
         messages = []
 
         for entry in entries:
             if entry.get('type') == 'event_msg':
                 payload = entry.get('payload', {})
                 if payload.get('type') == 'user_message':
-                    message_text = payload.get('message', '')
-                    timestamp = entry.get('timestamp')
-
-                    # Skip IDE context messages
-                    if message_text.startswith('# Context from my IDE setup:'):
-                        # Extract actual user request
-                        if '## My request for Codex:' in message_text:
-                            request = message_text.split('## My request for Codex:')[1].strip()
-                            messages.append({
-                                'timestamp': timestamp,
-                                'text': request
-                            })
-                    else:
-                        messages.append({
-                            'timestamp': timestamp,
-                            'text': message_text
-                        })
+                    # Also right for compacted entries, whose message is already the request
+                    request = self.get_request_text(payload.get('message', ''))
+                    if request is None:
+                        continue
+
+                    text, truncated = bound_text(request)
+                    locator = entry.get(LOCATOR_KEY)
+                    if truncated and locator:
+                        locator['truncated'] = True
+                    messages.append({
+                        'timestamp': entry.get('timestamp'),
+                        'text': text,
+                        'locator': locator
+                    })
 
         return messages
 
@@ -144,28 +151,19 @@ class CodexSessionsParser:
 
         return files
 
-    def is_trivial_activity(self, message_text: str, tool_uses: List[Dict[str, Any]]) -> bool:
-        """Determine if an activity is trivial based on content."""
-        trivial_patterns = [
-            'settings.json',
-            '.run.xml',
-            'configuration',
-            'typo',
-            'console.log',
-            'formatting',
-            'rename',
-            '.gitignore',
-            'helper script',
-            'utility script',
-            'ls -la',
-            'cd ',
-            'pwd'
+    def extract_file_modifications(self, tool_uses: List[Dict[str, Any]]) -> List[str]:
+        """Paths written or edited by tool uses (extract_file_operations also lists reads)."""
+        return [
+            tool_use['input'].get('path') or tool_use['input'].get('file_path')
+            for tool_use in tool_uses
+            if tool_use['tool'] in ('write_file', 'edit_file')
+            and (tool_use['input'].get('path') or tool_use['input'].get('file_path'))
         ]
 
-        message_lower = message_text.lower()
-
+    def is_trivial_activity(self, message_text: str, tool_uses: List[Dict[str, Any]]) -> bool:
+        """Determine if an activity is trivial based on content."""
         # Check message text
-        if any(pattern in message_lower for pattern in trivial_patterns):
+        if self.matches_trivial_pattern(message_text):
             return True
 
         # Check if only reading or listing
@@ -185,115 +183,134 @@ class CodexSessionsParser:
 
         return False
 
-    def parse_session_file(self, session_file: Path, since: datetime) -> List[Dict[str, Any]]:
-        """Parse a single session file and extract activities."""
-        activities = []
-        entries = self.parse_jsonl_file(session_file)
+    # --- engine stages ----------------------------------------------------
 
-        if not entries:
-            return activities
+    def discover(self, since: datetime) -> List[SessionUnit]:
+        """Find session files in the date directories that can overlap the window."""
+        # Sessions are filed under the day they started, so look a day further back
+        days_to_check = (date.today() - since.astimezone().date()).days + 2
+        dates = [date.today() - timedelta(days=i) for i in range(days_to_check)]
 
-        # Filter by timestamp
-        filtered_entries = [
-            e for e in entries
-            if e.get('timestamp') and
-            datetime.fromisoformat(e['timestamp'].replace('Z', '+00:00')) >= since
-        ]
+        def discover_root(sessions_dir: Path) -> List[SessionUnit]:
+            # Project is read from session_meta, so it is unknown until extract
+            return [
+                SessionUnit(path)
+                for check_date in dates for path in self.get_sessions_for_date(check_date, sessions_dir)
+            ]
 
-        if not filtered_entries:
-            return activities
+        return scan_roots(self.sessions_dirs, discover_root)
 
+    def extract(
+        self,
+        entries: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         # Get working directory from session metadata
         cwd = None
-        for entry in filtered_entries:
+        for entry in entries:
             if entry.get('type') == 'session_meta':
                 payload = entry.get('payload', {})
                 cwd = payload.get('cwd')
                 break
 
+        # The session's project travels on each request to emit
         project = self.extract_project_from_cwd(cwd) if cwd else "unknown"
+        requests = self.extract_user_messages(entries)
+        for request in requests:
+            request['cwd'] = cwd
+            request['project'] = project
+
+        return requests, self.extract_tool_uses(entries)
+
+    def compact_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep request previews, cwd and call paths; drop outputs, patches and transcripts."""
+        payload = entry.get('payload')
+        if not isinstance(payload, dict):
+            return entry
+
+        kind = payload.get('type')
+        if entry.get('type') == 'session_meta':
+            entry['payload'] = {'cwd': payload.get('cwd')}
+        elif entry.get('type') == 'event_msg' and kind == 'user_message':
+            request = self.get_request_text(payload.get('message', ''))
+            if request is None:
+                entry['payload'] = {'type': 'ide_context'}
+            else:
+                text, truncated = bound_text(request)
+                if truncated and entry.get(LOCATOR_KEY):
+                    entry[LOCATOR_KEY]['truncated'] = True
+                entry['payload'] = {'type': kind, 'message': text}
+        elif entry.get('type') == 'response_item' and kind == 'function_call':
+            arguments = payload.get('arguments', '{}')
+            try:
+                args_dict = json.loads(arguments) if isinstance(arguments, str) else arguments
+            except json.JSONDecodeError:
+                args_dict = {}
+            if isinstance(args_dict, dict):
+                args_dict = {
+                    k: bound_text(v)[0] if isinstance(v, str) else v
+                    for k, v in args_dict.items() if k in KEPT_ARGUMENT_KEYS
+                }
+            entry['payload'] = {'type': kind, 'name': payload.get('name'), 'arguments': args_dict}
+        else:
+            entry['payload'] = {'type': kind}
+        return entry
+
+    def load_request_body(self, locator: Dict[str, Any]) -> Optional[str]:
+        """Re-read the full text of a truncated request from its session file."""
+        entry = read_jsonl_record(Path(locator['file']), locator['offset'], locator['length'])
+        if not isinstance(entry, dict) or not isinstance(entry.get('payload'), dict):
+            return None
+        return self.get_request_text(entry['payload'].get('message', ''))
+
+    def classify(self, request: Dict[str, Any], tool_uses: List[Dict[str, Any]]) -> bool:
+        # Skip trivial activities
+        if self.is_trivial_activity(request['text'], tool_uses):
+            return False
 
-        # Extract messages and tool uses
-        messages = self.extract_user_messages(filtered_entries)
-        tool_uses = self.extract_tool_uses(filtered_entries)
-
-        # Combine into activities
-        for message in messages:
-            msg_time = datetime.fromisoformat(message['timestamp'].replace('Z', '+00:00'))
-
-            # Find related tool uses (within 5 minutes)
-            related_tools = [
-                t for t in tool_uses
-                if abs((datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) - msg_time).total_seconds()) < 300
-            ]
-
-            # Skip trivial activities
-            if self.is_trivial_activity(message['text'], related_tools):
-                continue
-
-            # Skip empty or very short messages
-            if len(message['text'].strip()) < 5:
-                continue
-
-            files = self.extract_file_operations(related_tools)
+        # Skip empty or very short messages
+        return len(request['text'].strip()) >= 5
+
+    def emit(
+        self,
+        request: Dict[str, Any],
+        tool_uses: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Dict[str, Any]:
+        activity = {
+            'timestamp': request['timestamp'],
+            'request': request['text'],
+            'tools': [t['tool'] for t in tool_uses],
+            'files': self.extract_file_operations(tool_uses),
+            'modified_files': self.extract_file_modifications(tool_uses),
+            'project': request['project'],
+            'cwd': request['cwd'],
+            'session_file': unit.path.name
+        }
+        locator = make_locator(unit.path, request.get('locator'))
+        if locator:
+            activity['request_locator'] = locator
+        return activity
 
-            activities.append({
-                'timestamp': message['timestamp'],
-                'request': message['text'],
-                'tools': [t['tool'] for t in related_tools],
-                'files': files,
-                'project': project,
-                'cwd': cwd,
-                'session_file': session_file.name
-            })
+    def parse_session_file(self, session_file: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse a single session file and extract activities."""
+        return self.create_engine().parse_unit(SessionUnit(session_file), since)
 
-        return activities
+    def get_sessions_for_date(self, target_date: date, sessions_dir: Optional[Path] = None) -> List[Path]:
+        """Get all session files for a specific date (under one root, or all of them)."""
+        if sessions_dir is None:
+            return [path for root in self.sessions_dirs for path in self.get_sessions_for_date(target_date, root)]
 
-    def get_sessions_for_date(self, target_date: date) -> List[Path]:
-        """Get all session files for a specific date."""
         year = target_date.year
         month = target_date.month
         day = target_date.day
 
-        session_dir = self.sessions_dir / str(year) / f"{month:02d}" / f"{day:02d}"
+        session_dir = sessions_dir / str(year) / f"{month:02d}" / f"{day:02d}"
 
         if not session_dir.exists():
             return []
 
-        return list(session_dir.glob("rollout-*.jsonl"))
-
-    def get_work_summary(self, since_hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
-        """Get work summary from all sessions since the given number of hours ago."""
-        from datetime import timezone
-        since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
-        summary = defaultdict(list)
-
-        # Calculate date range to check
-        days_to_check = (since_hours // 24) + 2  # Add buffer
-        dates_to_check = [
-            date.today() - timedelta(days=i)
-            for i in range(days_to_check)
-        ]
-
-        for check_date in dates_to_check:
-            session_files = self.get_sessions_for_date(check_date)
-
-            for session_file in session_files:
-                activities = self.parse_session_file(session_file, since)
-
-                for activity in activities:
-                    project = activity['project']
-
-                    # Skip non-work projects
-                    if not self.is_work_project(project):
-                        continue
-
-                    if project not in summary:
-                        summary[project] = []
-
-                    summary[project].append(activity)
-
-        return dict(summary)
+        return select_session_files(session_dir.glob("rollout-*.jsonl*"), '.jsonl')
 
 
 def main():
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Time budgets and cooperative cancellation for parsing runs.
+
+A run gets one root Deadline. The aggregator hands each source a share of
+what is left and the engine hands each file a share of its source's
+budget, so a slow file or source cannot starve the others; time a share
+does not use flows back to the ones after it. Readers check expired()
+between entries and stop early, keeping what they have. Whatever was cut
+short is recorded on the root so callers can mark the results as partial.
+cancel() ends the run (and every share of it) at the next check.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Entries decoded between two deadline checks
+CHECK_INTERVAL = 256
+
+
+class Deadline:
+    """A time budget shared by a run and its per-source and per-file shares."""
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional['Deadline'] = None):
+        self.parent = parent
+        self.root: 'Deadline' = parent.root if parent is not None else self
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        if parent is None:
+            self._cancelled = threading.Event()
+            self._lock = threading.Lock()
+            self.incomplete: List[Dict[str, Optional[str]]] = []
+
+    def cancel(self) -> None:
+        """Stop the whole run at the next check."""
+        self.root._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.root._cancelled.is_set()
+
+    def remaining(self) -> float:
+        """Seconds left, or infinity for an unbounded run."""
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.cancelled or self.remaining() <= 0
+
+    def share(self, fraction: float) -> 'Deadline':
+        """Child deadline for a fraction of the remaining time (never past this one)."""
+        remaining = self.remaining()
+        return Deadline(remaining * min(fraction, 1.0) if remaining != float('inf') else None, parent=self)
+
+    def mark_incomplete(self, source: str, file: Optional[str], reason: str) -> None:
+        """Record a source or file that was cut short ('partial') or never read ('skipped')."""
+        with self.root._lock:
+            self.root.incomplete.append({'source': source, 'file': file, 'reason': reason})
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.root.incomplete)
+
+
+def describe_incomplete(incomplete: List[Dict[str, Optional[str]]]) -> str:
+    """One-line summary of what a partial run left out, per source."""
+    per_source: Dict[str, Dict[str, int]] = {}
+    for item in incomplete:
+        counts = per_source.setdefault(item['source'], {})
+        key = item['reason'] if item['file'] else 'source skipped'
+        counts[key] = counts.get(key, 0) + 1
+
+    parts = []
+    for source, counts in per_source.items():
+        if 'source skipped' in counts:
+            parts.append(f"{source} (not read)")
+            continue
+        details = ', '.join(
+            f"{count} {reason} file{'s' if count != 1 else ''}" for reason, count in sorted(counts.items())
+        )
+        parts.append(f"{source} ({details})")
+    return '; '.join(parts)
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Differential check of the parsing pipeline against the reference parsers.
+
+Every session unit (a Claude project directory, a Codex session file, a
+Junie matterhorn directory) is parsed twice: by the frozen reference
+implementation in reference_parsers.py and by the current parser through
+the same public method (parse_project_sessions, parse_session_file,
+parse_chains_in_directory). Both outputs are normalized and compared, and
+both calls are timed, so one run proves the pipeline is still correct and
+measures how much faster it is.
+
+Units can come from a generated tree (with malformed lines, missing
+timestamps, out-of-order entries, busy sessions whose turns are closer than
+the correlation window and a large multi-week session) and from recorded
+trees on disk. Normalization only removes documented differences: request
+text is compared as its bounded preview, request locators and source tags
+are dropped, and tool lists are compared as multisets. A unit the reference
+parser crashes on is reported, not counted as a mismatch.
+
+Claude attributes each tool use to the turn it belongs to, where the
+reference gives it to every request within 5 minutes. Claude units are
+therefore parsed a third time, by the current pipeline with the
+reference's window correlation, and that output must match the reference
+activity for activity. The differences between it and the per-turn output
+are the intended segmentation changes: they are listed as known
+differences (tools or files moved between neighbouring turns, and turns
+that become or stop being trivial) instead of failing the check. A file
+modification claimed by two per-turn activities is still a mismatch.
+
+Caches written by the pipeline (time index, archive bounds) go to a
+temporary WORK_LOGGER_HOME, so checks never touch the real ones.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from parsing_engine import bound_text, correlate_by_window
+
+# Keys only the pipeline adds: where a truncated request can be re-read, which source it
+# came from, Junie plans/next steps kept for full-text search and Codex edits for --touched
+IGNORED_KEYS = ('request_locator', 'source', 'plans', 'modified_files')
+DEFAULT_HOURS = 24 * 14
+MAX_REPORTED_DIFFS = 5
+
+PROJECTS = ['blueprint-api', 'smile-app', 'workbench', 'optimizer-core', 'claude-config']
+REQUESTS = [
+    'implement the {0} endpoint',
+    'fix bug in {0} migration',
+    'review PR #{1} for {0}',
+    'refactor the {0} parser for performance',
+    'add tests for {0}',
+    'fix typo in {0}',
+    'deploy {0} to staging',
+]
+CLAUDE_TOOLS = ['Edit', 'Write', 'Read', 'Bash', 'Grep', 'NotebookEdit']
+CODEX_TOOLS = ['shell_command', 'edit_file', 'write_file', 'read_file']
+JUNIE_TOOLS = ['search_project', 'open_file', 'edit_file', 'run_test']
+
+# Idle minutes between turns. Sparse turns are further apart than the +/-5 minute
+# correlation window; in busy sessions several turns share one window
+SPARSE_GAPS = (7, 90)
+DENSE_GAPS = (1, 4)
+LONG_SESSION_TURNS = 3000
+
+
+# --- generated trees ----------------------------------------------------------
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _gap(rng: random.Random, gaps: Tuple[int, int]) -> timedelta:
+    """Idle time between the end of one turn and the next request, in minutes within gaps."""
+    return timedelta(minutes=rng.randint(*gaps), seconds=rng.randint(0, 59))
+
+
+def _request_text(rng: random.Random, project: str) -> str:
+    text = rng.choice(REQUESTS).format(project, rng.randint(100, 9999))
+    if rng.random() < 0.05:
+        # Longer than the preview bound, to exercise truncation and locators
+        text += ' ' + 'details ' * rng.randint(150, 400)
+    return text
+
+
+def _write_lines(path: Path, lines: List[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def _anomalies(rng: random.Random, records: List[Dict[str, Any]], is_turn_start: Callable[[Dict[str, Any]], bool]) -> List[str]:
+    """Corrupt a serialized session: malformed and blank lines, missing timestamps, local reordering.
+
+    A turn's first entry always keeps its timestamp and is never moved, so
+    a tool use is never written before the request it answers and every
+    request stays in the window.
+    """
+    for record in records:
+        if rng.random() < 0.03 and record.get('type') not in ('session_meta',) and not is_turn_start(record):
+            record.pop('timestamp', None)
+    lines = [(json.dumps(record), is_turn_start(record)) for record in records]
+    for _ in range(max(1, len(lines) // 40)):
+        position = rng.randrange(len(lines) + 1)
+        lines.insert(position, (rng.choice(['{"type": "user", "message": {"role"', '', '   ', 'not json']), False))
+    # Swap a few neighbours within a turn
+    for _ in range(max(1, len(lines) // 30)):
+        position = rng.randrange(max(1, len(lines) - 1))
+        if position + 1 < len(lines) and not lines[position][1] and not lines[position + 1][1]:
+            lines[position], lines[position + 1] = lines[position + 1], lines[position]
+    return [line for line, _ in lines]
+
+
+def _is_claude_request(record: Dict[str, Any]) -> bool:
+    content = record.get('message', {}).get('content') or [{}]
+    return record.get('type') == 'user' and content[0].get('type') == 'text'
+
+
+def _is_codex_request(record: Dict[str, Any]) -> bool:
+    return record.get('payload', {}).get('type') == 'user_message'
+
+
+def _claude_session(
+    rng: random.Random,
+    project: str,
+    start: datetime,
+    turns: int,
+    gaps: Tuple[int, int]
+) -> List[Dict[str, Any]]:
+    records = []
+    cwd = f"/Users/dev/Projects/{project}"
+    parent = None
+    turn_start = start
+    for _ in range(turns):
+        request_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        records.append({
+            'type': 'user', 'uuid': request_id, 'parentUuid': parent, 'cwd': cwd,
+            'timestamp': _iso(turn_start),
+            'message': {'role': 'user', 'content': [{'type': 'text', 'text': _request_text(rng, project)}]},
+        })
+        parent = request_id
+        moment = turn_start
+        for _ in range(rng.randint(0, 6)):
+            moment += timedelta(seconds=rng.randint(1, 20))
+            tool = rng.choice(CLAUDE_TOOLS)
+            tool_input = {'notebook_path' if tool == 'NotebookEdit' else 'file_path': f"{cwd}/src/m{rng.randint(0, 9)}.py"}
+            tool_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            records.append({
+                'type': 'assistant', 'uuid': tool_id, 'parentUuid': parent, 'cwd': cwd,
+                'timestamp': _iso(moment),
+                'message': {'role': 'assistant', 'content': [
+                    {'type': 'text', 'text': 'Working on it.'},
+                    {'type': 'tool_use', 'name': tool, 'input': tool_input},
+                ]},
+            })
+            result_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            records.append({
+                'type': 'user', 'uuid': result_id, 'parentUuid': tool_id, 'cwd': cwd,
+                'timestamp': _iso(moment + timedelta(seconds=1)),
+                'message': {'role': 'user', 'content': [{'type': 'tool_result', 'content': 'ok ' * rng.randint(1, 200)}]},
+            })
+            parent = result_id
+        turn_start = moment + _gap(rng, gaps)
+    return records
+
+
+def _codex_session(
+    rng: random.Random,
+    project: str,
+    start: datetime,
+    turns: int,
+    gaps: Tuple[int, int]
+) -> List[Dict[str, Any]]:
+    cwd = f"/Users/dev/Projects/{project}"
+    records: List[Dict[str, Any]] = [{'type': 'session_meta', 'timestamp': _iso(start), 'payload': {'cwd': cwd}}]
+    turn_start = start + timedelta(seconds=5)
+    for _ in range(turns):
+        message = _request_text(rng, project)
+        if rng.random() < 0.2:
+            message = f"# Context from my IDE setup:\n\nOpen files: a.py\n\n## My request for Codex:\n{message}"
+        records.append({'type': 'event_msg', 'timestamp': _iso(turn_start),
+                        'payload': {'type': 'user_message', 'message': message}})
+        moment = turn_start
+        for _ in range(rng.randint(0, 5)):
+            moment += timedelta(seconds=rng.randint(1, 20))
+            tool = rng.choice(CODEX_TOOLS)
+            arguments = {'command': rng.choice(['ls -la', 'pytest tests/test_api.py', 'cat setup.py'])} \
+                if tool == 'shell_command' else {'path': f"{cwd}/src/m{rng.randint(0, 9)}.py"}
+            records.append({'type': 'response_item', 'timestamp': _iso(moment),
+                            'payload': {'type': 'function_call', 'name': tool, 'arguments': json.dumps(arguments)}})
+            records.append({'type': 'response_item', 'timestamp': _iso(moment + timedelta(seconds=1)),
+                            'payload': {'type': 'function_call_output', 'output': 'x' * rng.randint(1, 500)}})
+        turn_start = moment + _gap(rng, gaps)
+    return records
+
+
+def _junie_chain(rng: random.Random, issues_dir: Path, project: str, created: datetime) -> None:
+    chain_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    name = _request_text(rng, project)[:80]
+    chain = {'id': {'id': chain_id}, 'name': name, 'created': _iso(created), 'state': rng.choice(['Done', 'Running'])}
+    issues_dir.mkdir(parents=True, exist_ok=True)
+    (issues_dir / f"chain-{chain_id}.json").write_text(json.dumps(chain))
+
+    for task_number in range(rng.randint(1, 3)):
+        observations = []
+        moment = created
+        for _ in range(rng.randint(0, 4)):
+            moment += timedelta(seconds=rng.randint(5, 60))
+            observations.append({
+                'created': _iso(moment),
+                'userResponse': {'type': 'MatterhornUserChatMessage', 'content': _request_text(rng, project)},
+                'assistantRequest': {
+                    'content': f"<PLAN>{_request_text(rng, project)}</PLAN><NEXT_STEP>run tests</NEXT_STEP>",
+                    'toolUses': [{'name': rng.choice(JUNIE_TOOLS)} for _ in range(rng.randint(0, 3))],
+                },
+            })
+        task = {
+            'created': _iso(created),
+            'context': {'description': _request_text(rng, project)},
+            'finalAgentState': {
+                'observations': observations,
+                'issue': {'editorContext': {'openFiles': [f"src/m{i}.py" for i in range(rng.randint(0, 7))]}},
+            },
+        }
+        (issues_dir / f"chain-{chain_id}" / f"task-{task_number}.json").parent.mkdir(parents=True, exist_ok=True)
+        (issues_dir / f"chain-{chain_id}" / f"task-{task_number}.json").write_text(json.dumps(task))
+    if rng.random() < 0.1:
+        (issues_dir / f"chain-{chain_id}" / "task-broken.json").write_text('{"created": ')
+
+
+def generate_tree(root: Path, seed: int = 0, sessions: int = 40, days: int = 30) -> Dict[str, Path]:
+    """Write Claude, Codex and Junie session trees under root and return their roots."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    roots = {
+        'claude': root / 'claude' / 'projects',
+        'codex': root / 'codex' / 'sessions',
+        'junie': root / 'jetbrains',
+    }
+
+    for number in range(sessions):
+        project = rng.choice(PROJECTS)
+        gaps = DENSE_GAPS if number % 3 == 0 else SPARSE_GAPS
+        start = now - timedelta(days=rng.uniform(0, days))
+        records = _claude_session(rng, project, start, rng.randint(1, 12), gaps)
+        name = f"{uuid.UUID(int=rng.getrandbits(128))}.jsonl"
+        if number % 7 == 0:
+            name = f"agent-{name}"
+        _write_lines(roots['claude'] / f"-Users-dev-Projects-{project}" / name, _anomalies(rng, records, _is_claude_request))
+
+        start = now - timedelta(days=rng.uniform(0, days))
+        records = _codex_session(rng, project, start, rng.randint(1, 12), gaps)
+        day_dir = roots['codex'] / f"{start:%Y}" / f"{start:%m}" / f"{start:%d}"
+        _write_lines(day_dir / f"rollout-{number:04d}.jsonl", _anomalies(rng, records, _is_codex_request))
+
+        matterhorn = roots['junie'] / 'IntelliJIdea2025.2' / 'projects' / f"{project}.{number:08x}" / 'matterhorn' / '.matterhorn'
+        for _ in range(rng.randint(1, 4)):
+            _junie_chain(rng, matterhorn / 'issues', project, now - timedelta(days=rng.uniform(0, days)))
+
+    # One long-running session (over the time index threshold) spanning the whole period:
+    # gaps averaging the period over its turns, less about a minute of tool calls per turn
+    mean_gap = days * 24 * 60 // LONG_SESSION_TURNS
+    long_gaps = (max(0, mean_gap - 8), max(1, mean_gap + 6))
+    records = _claude_session(rng, 'blueprint-api', now - timedelta(days=days), LONG_SESSION_TURNS, long_gaps)
+    _write_lines(roots['claude'] / '-Users-dev-Projects-blueprint-api' / 'long-running.jsonl', [json.dumps(r) for r in records])
+    return roots
+
+
+# --- units --------------------------------------------------------------------
+
+Unit = Tuple[str, Path]
+
+
+def discover_units(roots: Dict[str, Path]) -> List[Unit]:
+    """The units the compared methods take, per source."""
+    units: List[Unit] = []
+    claude = roots.get('claude')
+    if claude and claude.is_dir():
+        units.extend(
+            ('claude', project_dir) for project_dir in sorted(claude.iterdir())
+            if project_dir.is_dir() and not project_dir.name.startswith('.')
+        )
+    codex = roots.get('codex')
+    if codex and codex.is_dir():
+        units.extend(('codex', path) for path in sorted(codex.rglob('rollout-*.jsonl')))
+    junie = roots.get('junie')
+    if junie and junie.is_dir():
+        units.extend(('junie', path) for path in sorted(junie.glob('*/projects/*/matterhorn/.matterhorn')))
+    return units
+
+
+def _window_correlated(parser: Any) -> Any:
+    """The parser with the reference's segmentation: every tool within the window of a request."""
+    parser.correlate = lambda requests, tool_uses: correlate_by_window(
+        requests, tool_uses, parser.correlation_window_seconds
+    )
+    return parser
+
+
+def unit_methods() -> Dict[str, Tuple[Callable, Callable, Optional[Callable]]]:
+    """(reference, current, current with the reference's segmentation) parse functions per source.
+
+    Each takes (unit path, since). The third is None for sources whose
+    segmentation did not change.
+    """
+    from claude_projects_parser import ClaudeProjectsParser
+    from codex_sessions_parser import CodexSessionsParser
+    from junie_sessions_parser import JunieSessionsParser
+    from reference_parsers import (
+        ReferenceClaudeProjectsParser, ReferenceCodexSessionsParser, ReferenceJunieSessionsParser
+    )
+
+    return {
+        'claude': (
+            ReferenceClaudeProjectsParser().parse_project_sessions,
+            ClaudeProjectsParser().parse_project_sessions,
+            _window_correlated(ClaudeProjectsParser()).parse_project_sessions,
+        ),
+        'codex': (ReferenceCodexSessionsParser().parse_session_file, CodexSessionsParser().parse_session_file, None),
+        'junie': (
+            ReferenceJunieSessionsParser().parse_chains_in_directory,
+            JunieSessionsParser().parse_chains_in_directory,
+            None,
+        ),
+    }
+
+
+# --- comparison ---------------------------------------------------------------
+
+def normalize(activities: List[Dict[str, Any]], ignored: Tuple[str, ...] = ()) -> List[str]:
+    """Canonical, sorted JSON for each activity, without documented differences."""
+    skipped = set(IGNORED_KEYS) | set(ignored)
+    normalized = []
+    for activity in activities:
+        item = {key: value for key, value in activity.items() if key not in skipped}
+        if isinstance(item.get('request'), str):
+            item['request'] = bound_text(item['request'])[0]
+        if isinstance(item.get('tools'), list):
+            item['tools'] = sorted(item['tools'], key=str)
+        normalized.append(json.dumps(item, sort_keys=True, default=str))
+    return sorted(normalized)
+
+
+def repeated_files(activities: List[Dict[str, Any]]) -> List[Any]:
+    """File modifications (by timestamp, tool and path) that more than one activity claims."""
+    claims = Counter(
+        json.dumps(item, sort_keys=True, default=str)
+        for activity in activities for item in activity.get('files') or []
+    )
+    return [json.loads(text) for text, count in sorted(claims.items()) if count > 1]
+
+
+def diff_outputs(reference: List[str], current: List[str]) -> Dict[str, List[Any]]:
+    """Activities only one side produced, pairing those that differ in some fields."""
+    missing = list((Counter(reference) - Counter(current)).elements())
+    extra = list((Counter(current) - Counter(reference)).elements())
+
+    def identity(item: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+        return item.get('timestamp'), item.get('session_file'), item.get('chain_name')
+
+    extra_by_identity = {}
+    for text in extra:
+        item = json.loads(text)
+        extra_by_identity.setdefault(identity(item), []).append(item)
+
+    changed, only_reference = [], []
+    for text in missing:
+        item = json.loads(text)
+        candidates = extra_by_identity.get(identity(item))
+        if candidates:
+            other = candidates.pop(0)
+            fields = sorted(k for k in set(item) | set(other) if item.get(k) != other.get(k))
+            changed.append({
+                'timestamp': item.get('timestamp') or item.get('session_file'),
+                'fields': {k: {'reference': item.get(k), 'current': other.get(k)} for k in fields},
+            })
+        else:
+            only_reference.append(item)
+    only_current = [item for items in extra_by_identity.values() for item in items]
+    return {'changed': changed, 'only_reference': only_reference, 'only_current': only_current}
+
+
+def _timed(function: Callable, path: Path, since: datetime, repeat: int) -> Tuple[Optional[List[Dict[str, Any]]], float, Optional[str]]:
+    """Best-of-repeat run time and the output (or error) of one parse call."""
+    best = float('inf')
+    result, error = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            result = function(path, since)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            result = None
+        best = min(best, time.perf_counter() - started)
+    return result, best, error
+
+
+def run_harness(
+    roots: Dict[str, Path],
+    since: datetime,
+    repeat: int = 1,
+    label: str = 'tree',
+    ignored: Tuple[str, ...] = ()
+) -> Dict[str, Any]:
+    """Compare reference and current output for every unit under roots."""
+    methods = unit_methods()
+    report: Dict[str, Any] = {'label': label, 'sources': {}, 'mismatches': [], 'known': []}
+    for source, path in discover_units(roots):
+        reference_fn, current_fn, segmented_fn = methods[source]
+        stats = report['sources'].setdefault(source, {
+            'units': 0, 'activities': 0, 'mismatched_units': 0, 'known_differences': 0, 'reference_errors': 0,
+            'current_errors': 0, 'reference_seconds': 0.0, 'current_seconds': 0.0,
+        })
+        stats['units'] += 1
+
+        # The current parser runs first so a warm time index is only reused with repeat > 1
+        current, current_seconds, current_error = _timed(current_fn, path, since, repeat)
+        reference, reference_seconds, reference_error = _timed(reference_fn, path, since, repeat)
+
+        if current_error:
+            stats['current_errors'] += 1
+            report['mismatches'].append({'source': source, 'unit': str(path), 'error': current_error})
+            continue
+        if reference_error:
+            # Inputs the reference parser cannot read are not a regression
+            stats['reference_errors'] += 1
+            report.setdefault('reference_errors', []).append({'source': source, 'unit': str(path), 'error': reference_error})
+            continue
+
+        stats['activities'] += len(current)
+        stats['reference_seconds'] += reference_seconds
+        stats['current_seconds'] += current_seconds
+        expected, actual = normalize(reference, ignored), normalize(current, ignored)
+        repeated = []
+        if segmented_fn is not None:
+            # The reference must match the pipeline with its own segmentation; the rest is known
+            segmented = normalize(segmented_fn(path, since), ignored)
+            if segmented != actual:
+                known = diff_outputs(segmented, actual)
+                stats['known_differences'] += sum(len(items) for items in known.values())
+                report['known'].append({'source': source, 'unit': str(path), 'diff': known})
+            actual = segmented
+            repeated = repeated_files(current)
+        if expected != actual or repeated:
+            stats['mismatched_units'] += 1
+            diff = diff_outputs(expected, actual)
+            diff['repeated'] = repeated
+            report['mismatches'].append({'source': source, 'unit': str(path), 'diff': diff})
+
+    for stats in report['sources'].values():
+        stats['speedup'] = round(stats['reference_seconds'] / stats['current_seconds'], 2) if stats['current_seconds'] else None
+    return report
+
+
+def _diff_lines(diff: Dict[str, List[Any]]) -> List[str]:
+    lines = []
+    for change in diff['changed'][:MAX_REPORTED_DIFFS]:
+        for field, values in change['fields'].items():
+            lines.append(f"  {change['timestamp']} {field}: {str(values['reference'])[:120]!s} -> {str(values['current'])[:120]!s}")
+    for item in diff['only_reference'][:MAX_REPORTED_DIFFS]:
+        lines.append(f"  missing: {item.get('timestamp')} {str(item.get('request'))[:80]}")
+    for item in diff['only_current'][:MAX_REPORTED_DIFFS]:
+        lines.append(f"  extra:   {item.get('timestamp')} {str(item.get('request'))[:80]}")
+    for item in diff.get('repeated', [])[:MAX_REPORTED_DIFFS]:
+        lines.append(f"  in several activities: {item.get('timestamp')} {item.get('tool')} {item.get('file')}")
+    return lines
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Per-source summary table, the first few mismatches and the first few known differences."""
+    lines = [f"=== Differential check: {report['label']} ==="]
+    for source, stats in report['sources'].items():
+        lines.append(
+            f"{source}: {stats['units']} units, {stats['activities']} activities, "
+            f"{stats['mismatched_units']} mismatched, {stats['current_errors']} errors, "
+            f"{stats['reference_errors']} unreadable by reference"
+            + (f", {stats['known_differences']} known differences" if stats['known_differences'] else '')
+            + f" | reference {stats['reference_seconds']:.3f}s, current {stats['current_seconds']:.3f}s"
+            + (f", {stats['speedup']}x" if stats['speedup'] else '')
+        )
+
+    for mismatch in report['mismatches'][:MAX_REPORTED_DIFFS]:
+        lines.append(f"\n[{mismatch['source']}] {mismatch['unit']}")
+        if 'error' in mismatch:
+            lines.append(f"  current parser raised {mismatch['error']}")
+            continue
+        lines.extend(_diff_lines(mismatch['diff']))
+    if len(report['mismatches']) > MAX_REPORTED_DIFFS:
+        lines.append(f"\n... {len(report['mismatches']) - MAX_REPORTED_DIFFS} more mismatched units")
+
+    if report['known']:
+        lines.append("\nKnown differences (per-turn attribution vs the reference's 5-minute window):")
+        for known in report['known'][:MAX_REPORTED_DIFFS]:
+            lines.append(f"\n[{known['source']}] {known['unit']}")
+            lines.extend(_diff_lines(known['diff']))
+        if len(report['known']) > MAX_REPORTED_DIFFS:
+            lines.append(f"\n... {len(report['known']) - MAX_REPORTED_DIFFS} more units with known differences")
+    return '\n'.join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Compare the parsing pipeline with the reference parsers and time both'
+    )
+    parser.add_argument('--no-generated', action='store_true', help='Skip the generated tree')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated tree (default: 0)')
+    parser.add_argument('--sessions', type=int, default=40, help='Sessions per source in the generated tree (default: 40)')
+    parser.add_argument('--claude-dir', help='Recorded Claude projects directory to check, e.g. ~/.claude/projects')
+    parser.add_argument('--codex-dir', help='Recorded Codex sessions directory to check, e.g. ~/.codex/sessions')
+    parser.add_argument('--jetbrains-dir', help='Recorded JetBrains cache directory to check (Junie)')
+    parser.add_argument('--hours', type=int, default=DEFAULT_HOURS, help=f'Window to parse (default: {DEFAULT_HOURS})')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per unit, best time kept (default: 1)')
+    parser.add_argument(
+        '--ignore-fields',
+        default='',
+        metavar='FIELDS',
+        help='Comma-separated activity fields to leave out of the comparison, e.g. tools,files'
+    )
+    parser.add_argument('--json', action='store_true', help='Print the full reports as JSON')
+    args = parser.parse_args()
+
+    since = datetime.now(timezone.utc) - timedelta(hours=args.hours)
+    ignored = tuple(field.strip() for field in args.ignore_fields.split(',') if field.strip())
+    recorded = {
+        source: Path(value).expanduser()
+        for source, value in (('claude', args.claude_dir), ('codex', args.codex_dir), ('junie', args.jetbrains_dir))
+        if value
+    }
+    if args.no_generated and not recorded:
+        parser.error('nothing to check: give a recorded directory or drop --no-generated')
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix='work-logger-diff-') as scratch:
+        os.environ['WORK_LOGGER_HOME'] = str(Path(scratch) / 'home')
+        if not args.no_generated:
+            roots = generate_tree(Path(scratch) / 'generated', seed=args.seed, sessions=args.sessions)
+            reports.append(run_harness(roots, since, args.repeat, f"generated (seed {args.seed})", ignored))
+        if recorded:
+            reports.append(run_harness(recorded, since, args.repeat, 'recorded', ignored))
+
+    if args.json:
+        print(json.dumps(reports, indent=2, default=str))
+    else:
+        print('\n\n'.join(format_report(report) for report in reports))
+    sys.exit(1 if any(report['mismatches'] for report in reports) else 0)
+
+
+if __name__ == '__main__':
+    main()
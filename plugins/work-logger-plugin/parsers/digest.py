@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Token-bounded digest of a work summary, for handing to a model.
+
+Activities are scored by substantial keywords in the request, distinct
+files touched, tool volume and recency. Repeats of the same request within
+a project (same normalized opening words) collapse into one line with a
+count. Lines are then taken in score order until the estimated token cost
+reaches the budget and printed grouped by project, so the prompt stays the
+same size however busy the day was. Tokens are estimated locally from
+character and word counts; no tokenizer is loaded.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from activity_store import activity_files
+from parsing_engine import parse_timestamp
+
+DEFAULT_BUDGET_TOKENS = 1500
+MAX_LINE_CHARS = 160
+MAX_LINE_FILES = 3
+HEADER_TOOLS = 4
+
+# Also the filter of the aggregator's bullets format
+SUBSTANTIAL_KEYWORDS = [
+    'pr', 'pull request', 'merge', 'deploy',
+    'implement', 'fix', 'bug', 'feature',
+    'api', 'endpoint', 'migration', 'refactor',
+    'optimize', 'performance', 'review',
+    'sync', 'meeting', 'discuss'
+]
+_KEYWORD_PATTERN = re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in SUBSTANTIAL_KEYWORDS) + r')\b')
+_REPEAT_KEY_PATTERN = re.compile(r'[\W\d_]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: about 4 characters or 3/4 of a word per token."""
+    return max((len(text) + 3) // 4, (len(text.split()) * 4 + 2) // 3)
+
+
+def repeat_key(request: str) -> str:
+    """Requests with the same opening words (ignoring case, digits and punctuation) are repeats."""
+    return _REPEAT_KEY_PATTERN.sub(' ', request.lower()).strip()[:50]
+
+
+def score_activity(activity: Dict[str, Any], files: List[str], age_fraction: float) -> float:
+    """Keywords and files weigh most; tool volume grows logarithmically; newer work breaks ties."""
+    keywords = len(set(_KEYWORD_PATTERN.findall(activity.get('request', '').lower())))
+    tools = len(activity.get('tools') or [])
+    return 3 * min(keywords, 3) + 2 * min(len(files), 5) + math.log1p(tools) + (1 - age_fraction)
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+
+def _base_name(path: str) -> str:
+    return path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def build_digest(
+    summary: Dict[str, List[Dict[str, Any]]],
+    budget_tokens: int = DEFAULT_BUDGET_TOKENS,
+    since_hours: Optional[int] = None
+) -> str:
+    """Render a merged summary as a digest of at most about budget_tokens tokens."""
+    parsed = []
+    for project, activities in summary.items():
+        for activity in activities:
+            timestamp = parse_timestamp(activity.get('timestamp'))
+            if timestamp is not None:
+                parsed.append((timestamp, project, activity))
+    if not parsed:
+        return "No work activities found."
+
+    first = min(timestamp for timestamp, _, _ in parsed)
+    last = max(timestamp for timestamp, _, _ in parsed)
+    span = (last - first).total_seconds() or 1.0
+
+    # Collapse repeats per project, keeping the best-scoring request as the representative
+    groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    projects: Dict[str, Dict[str, Any]] = {}
+    for timestamp, project, activity in parsed:
+        files = activity_files(activity)
+        score = score_activity(activity, files, (last - timestamp).total_seconds() / span)
+
+        stats = projects.setdefault(project, {'activities': 0, 'tools': Counter(), 'files': set(), 'score': 0.0})
+        stats['activities'] += 1
+        stats['tools'].update(tool for tool in activity.get('tools') or [] if tool)
+        stats['files'].update(files)
+        stats['score'] += score
+
+        key = (project, repeat_key(activity.get('request', '')))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'project': project, 'count': 0, 'best': -1.0,
+                'request': '', 'last': timestamp, 'files': [],
+            }
+        group['count'] += 1
+        group['last'] = max(group['last'], timestamp)
+        for path in files:
+            if path not in group['files']:
+                group['files'].append(path)
+        if score > group['best']:
+            group['best'] = score
+            group['request'] = activity.get('request', '')
+
+    def render_line(group: Dict[str, Any]) -> str:
+        when = group['last'].astimezone().strftime('%H:%M')
+        line = f"- [{when}] {_shorten(group['request'], MAX_LINE_CHARS)}"
+        if group['count'] > 1:
+            line += f" (x{group['count']})"
+        if group['files']:
+            names = ', '.join(_base_name(path) for path in group['files'][:MAX_LINE_FILES])
+            extra = len(group['files']) - MAX_LINE_FILES
+            line += f" | files: {names}" + (f" +{extra}" if extra > 0 else '')
+        return line
+
+    def render_project(project: str) -> str:
+        stats = projects[project]
+        parts = [f"{stats['activities']} activities"]
+        if stats['tools']:
+            parts.append(', '.join(f"{tool} {count}" for tool, count in stats['tools'].most_common(HEADER_TOOLS)))
+        if stats['files']:
+            parts.append(f"{len(stats['files'])} files")
+        return f"\n## {project} ({'; '.join(parts)})"
+
+    window = f"last {since_hours}h" if since_hours else (
+        f"{first.astimezone():%Y-%m-%d %H:%M} to {last.astimezone():%Y-%m-%d %H:%M}"
+    )
+    header = f"Work digest, {window}: {len(parsed)} activities in {len(projects)} projects"
+
+    # The omission note is always reserved so adding it never breaks the budget
+    used = estimate_tokens(header) + estimate_tokens(f"(+{len(groups)} lower-ranked items omitted)")
+    chosen: Dict[str, List[Dict[str, Any]]] = {}
+    # Repeated work ranks above a single instance of it, but only logarithmically
+    ranked = sorted(groups.values(), key=lambda group: group['best'] + 2 * math.log2(group['count']), reverse=True)
+    omitted = 0
+    for group in ranked:
+        cost = estimate_tokens(render_line(group))
+        if group['project'] not in chosen:
+            cost += estimate_tokens(render_project(group['project']))
+        if used + cost > budget_tokens:
+            omitted += 1
+            continue
+        used += cost
+        chosen.setdefault(group['project'], []).append(group)
+
+    lines = [header]
+    for project in sorted(chosen, key=lambda name: projects[name]['score'], reverse=True):
+        lines.append(render_project(project))
+        lines.extend(render_line(group) for group in chosen[project])
+    if omitted:
+        lines.append(f"\n(+{omitted} lower-ranked items omitted)")
+    return '\n'.join(lines)
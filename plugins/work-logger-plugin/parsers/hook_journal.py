@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Reader for the hook journal written by hooks/journal_hook.sh.
+
+With the plugin's hooks enabled, Claude Code appends one tab-separated
+record per prompt and per tool call to journal/YYYY-MM-DD.tsv (local day)
+under the work logger home:
+
+    epoch  session  event  tool  project_dir  file_path  prompt_preview
+
+Text fields are still JSON-escaped, and the prompt preview may run past its
+closing quote; decode_field() reads each one back. A prompt opens an
+activity in its session and the tool calls after it attach to that
+activity, which gives the same shape as the Claude transcript parser
+without reading any transcript. The journal is only trusted for windows
+that start after its first record (journal/active-since), and only for the
+sessions it saw: hooks can be disabled, or not enabled in some projects,
+so transcripts written in the window whose session never reached the
+journal are reported by uncovered() and parsed from disk instead.
+"""
+
+import json
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from parsing_engine import ParsingEngine, SessionUnit
+from session_io import session_stem
+from storage_paths import work_logger_home
+
+JOURNAL_DIR = 'journal'
+JOURNAL_SUFFIX = '.tsv'
+ACTIVE_SINCE_FILE = 'active-since'
+FIELD_COUNT = 7
+
+# Longest incomplete escape (\uXXXX) a cut-off preview can end with
+_MAX_PARTIAL_ESCAPE = 6
+
+_decoder = json.JSONDecoder()
+
+
+def decode_field(raw: str) -> str:
+    """Decode a JSON-escaped journal field, stopping at its closing quote if present."""
+    if '\\' not in raw and '"' not in raw:
+        return raw
+    for cut in range(_MAX_PARTIAL_ESCAPE + 1):
+        text = raw[:len(raw) - cut] if cut else raw
+        try:
+            value, _ = _decoder.raw_decode('"' + text + '"')
+            return value
+        except ValueError:
+            continue
+    return raw
+
+
+def project_dir_name(project_dir: str) -> str:
+    """Name Claude Code gives a project's transcript directory, e.g. -Users-me-Projects-app."""
+    return re.sub(r'[^A-Za-z0-9]', '-', project_dir)
+
+
+class HookJournal:
+    """Activities of Claude Code sessions read from the hook journal."""
+
+    def __init__(self, journal_dir: Optional[Path] = None):
+        self.journal_dir = Path(journal_dir) if journal_dir is not None else work_logger_home() / JOURNAL_DIR
+
+    def active_since(self) -> Optional[float]:
+        """Epoch of the first journaled event, or None when the hooks never ran."""
+        try:
+            return float((self.journal_dir / ACTIVE_SINCE_FILE).read_text().strip())
+        except (OSError, ValueError):
+            return None
+
+    def covers(self, since: datetime, transcripts: Optional[List[SessionUnit]] = None) -> bool:
+        """Whether the hooks were running for the whole window (and saw every given transcript)."""
+        first = self.active_since()
+        if first is None or first > since.timestamp():
+            return False
+        return not transcripts or not self.uncovered(since, transcripts)
+
+    def session_ids(self, since: datetime) -> Set[str]:
+        """Sessions with at least one journaled event since then."""
+        return {record['session'] for record in self.iter_records(since)}
+
+    def uncovered(self, since: datetime, transcripts: List[SessionUnit]) -> List[SessionUnit]:
+        """Transcripts written in the window whose session has no journaled event in it."""
+        seen = self.session_ids(since)
+        since_epoch = since.timestamp()
+        return [
+            unit for unit in transcripts
+            if Path(session_stem(unit.path)).stem not in seen and ParsingEngine.unit_stat(unit)[0] >= since_epoch
+        ]
+
+    def day_files(self, since: datetime) -> List[Path]:
+        """Journal files of the local days from since through today."""
+        day = since.astimezone().date() - timedelta(days=1)
+        files = []
+        while day <= date.today():
+            path = self.journal_dir / f"{day.isoformat()}{JOURNAL_SUFFIX}"
+            if path.exists():
+                files.append(path)
+            day += timedelta(days=1)
+        return files
+
+    def iter_records(self, since: datetime) -> Iterator[Dict[str, Any]]:
+        """Yield decoded journal records at or after since, skipping torn lines."""
+        since_epoch = since.timestamp()
+        for path in self.day_files(since):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) != FIELD_COUNT:
+                        continue
+                    try:
+                        epoch = float(fields[0])
+                    except ValueError:
+                        continue
+                    if epoch < since_epoch:
+                        continue
+                    yield {
+                        'epoch': epoch,
+                        'session': decode_field(fields[1]),
+                        'event': fields[2],
+                        'tool': decode_field(fields[3]),
+                        'project_dir': decode_field(fields[4]),
+                        'file': decode_field(fields[5]),
+                        'prompt': decode_field(fields[6]),
+                    }
+
+    def get_work_summary(self, since_hours: int, parser: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """Per-project activities of the window, classified by the Claude parser."""
+        since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+
+        by_session: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in self.iter_records(since):
+            by_session[record['session']].append(record)
+
+        summary: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for session, records in by_session.items():
+            # Day files are appended in order; sorting only settles clock skew between hook processes
+            records.sort(key=lambda record: record['epoch'])
+            turn: Optional[Dict[str, Any]] = None
+            for record in records + [None]:
+                if record is None or record['event'] == 'prompt':
+                    if turn is not None:
+                        self._emit(turn, session, parser, summary)
+                    turn = {'prompt': record, 'tool_uses': []} if record is not None else None
+                elif turn is not None:
+                    # Tools before the first prompt of the window belong to an earlier request
+                    turn['tool_uses'].append(self._tool_use(record))
+        return dict(summary)
+
+    def _tool_use(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        key = 'notebook_path' if record['tool'] == 'NotebookEdit' else 'file_path'
+        return {
+            'tool': record['tool'],
+            'input': {key: record['file']} if record['file'] else {},
+            'timestamp': _iso(record['epoch']),
+            'cwd': record['project_dir'],
+        }
+
+    def _emit(
+        self,
+        turn: Dict[str, Any],
+        session: str,
+        parser: Any,
+        summary: Dict[str, List[Dict[str, Any]]]
+    ) -> None:
+        prompt = turn['prompt']
+        tool_uses = turn['tool_uses']
+        project = parser.get_project_name(project_dir_name(prompt['project_dir']))
+        if not parser.is_work_project(project) or parser.is_trivial_activity(prompt['prompt'], tool_uses):
+            return
+        summary[project].append({
+            'timestamp': _iso(prompt['epoch']),
+            'request': prompt['prompt'],
+            'tools': [t['tool'] for t in tool_uses],
+            'files': self._distinct_files(parser.extract_file_modifications(tool_uses)),
+            'session_file': f"{session}.jsonl",
+        })
+
+    @staticmethod
+    def _distinct_files(modifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """First modification of each file in a turn (journal times are whole seconds, so repeats look identical)."""
+        seen = set()
+        distinct = []
+        for modification in modifications:
+            if modification['file'] not in seen:
+                seen.add(modification['file'])
+                distinct.append(modification)
+        return distinct
+
+
+def _iso(epoch: float) -> str:
+    """Timestamp in the transcripts' format, e.g. 2025-01-02T03:04:05.000Z."""
+    moment = datetime.fromtimestamp(epoch, timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
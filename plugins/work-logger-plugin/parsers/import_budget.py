@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Startup check for the aggregator CLI.
+
+Runs fresh interpreters with `python -X importtime` and fails when:
+
+- importing session_aggregator takes longer than the budget (cumulative
+  import time, best of a few runs, so one slow run does not fail it);
+- a run imports the parser module of a source that is absent or was not
+  requested. Runs use an empty temporary home in which only the roots
+  a case names exist, so the real session directories never count.
+
+Exit status is 1 on any failure, so the check can gate a commit or CI job.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from source_registry import SOURCES
+
+PARSERS_DIR = Path(__file__).parent
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_RUNS = 3
+
+# (sources requested with --sources, sources whose root exists): only sources in both may be imported
+CASES: List[Tuple[Optional[str], List[str]]] = [
+    (None, []),
+    ('claude,codex,junie', ['claude']),
+    ('claude', ['claude', 'codex']),
+]
+
+
+def imported_modules(args: List[str], env: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """Cumulative import time (microseconds) per top-level import of one interpreter run."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        cwd=str(PARSERS_DIR), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        try:
+            modules[name.strip()] = int(cumulative.strip())
+        except ValueError:
+            continue
+    return modules
+
+
+def aggregator_import_ms(runs: int) -> Optional[float]:
+    """Best cumulative import time of session_aggregator in milliseconds."""
+    times = [
+        imported_modules(['-c', 'import session_aggregator']).get('session_aggregator')
+        for _ in range(runs)
+    ]
+    times = [value for value in times if value is not None]
+    return min(times) / 1000 if times else None
+
+
+def source_roots(home: Path, name: str) -> List[Path]:
+    """Where a source's default roots fall under a given home directory."""
+    return [
+        Path(root.replace('~', str(home), 1)) if root.startswith('~') else Path(root)
+        for root in SOURCES[name].default_roots
+    ]
+
+
+def unexpected_parsers(requested: Optional[str], present: List[str]) -> List[str]:
+    """Parser modules one aggregator run imported although their source is absent or not requested."""
+    with tempfile.TemporaryDirectory(prefix='work-logger-import-') as scratch:
+        home = Path(scratch)
+        env = dict(os.environ, HOME=str(home), WORK_LOGGER_HOME=str(home / 'work-logger'))
+        # Junie's Linux root follows XDG_CACHE_HOME; keep it inside the scratch home
+        env['XDG_CACHE_HOME'] = str(home / '.cache')
+        for name in present:
+            for root in source_roots(home, name):
+                root.mkdir(parents=True, exist_ok=True)
+
+        args = ['session_aggregator.py', '--hours', '1', '--no-index', '--no-journal']
+        if requested:
+            args += ['--sources', requested]
+        modules = imported_modules(args, env)
+
+    wanted = set(requested.split(',')) if requested else set(SOURCES)
+    allowed = {SOURCES[name].module for name in wanted & set(present)}
+    return sorted(
+        spec.module for spec in SOURCES.values()
+        if spec.module in modules and spec.module not in allowed
+    )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check aggregator import time and lazy parser imports')
+    parser.add_argument(
+        '--budget-ms',
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f'Maximum cumulative import time of session_aggregator (default: {DEFAULT_BUDGET_MS:g})'
+    )
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f'Runs, best kept (default: {DEFAULT_RUNS})')
+    args = parser.parse_args()
+
+    failed = False
+    elapsed = aggregator_import_ms(max(1, args.runs))
+    if elapsed is None:
+        print("session_aggregator: import failed")
+        failed = True
+    else:
+        over = elapsed > args.budget_ms
+        failed |= over
+        print(f"session_aggregator: {elapsed:.1f} ms (budget {args.budget_ms:g} ms){' OVER BUDGET' if over else ''}")
+
+    for requested, present in CASES:
+        unexpected = unexpected_parsers(requested, present)
+        failed |= bool(unexpected)
+        label = f"--sources {requested or '(all)'}, present: {', '.join(present) or 'none'}"
+        print(f"{label}: " + (f"imported {', '.join(unexpected)}" if unexpected else 'ok'))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,33 +4,155 @@ Parser for Junie (Matterhorn) sessions stored in JetBrains caches.
 Extracts work activities from Junie conversation history.
 """
 
+import hashlib
 import json
 import os
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from stat import S_ISDIR
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from parsing_engine import (
+    BaseSessionParser, SessionUnit, bound_text, parse_timestamp, read_json, scan_roots
+)
+from source_registry import jetbrains_cache_roots
+from storage_paths import data_path
+
+# Plans and next steps kept per task (each bounded to a preview)
+MAX_PLANS_PER_TASK = 5
+
+# Cache directory names of JetBrains IDEs that can run Junie
+JETBRAINS_IDE_PREFIXES = (
+    'IntelliJIdea', 'IdeaIC', 'PyCharm', 'WebStorm', 'GoLand', 'PhpStorm', 'RubyMine',
+    'CLion', 'Rider', 'DataGrip', 'DataSpell', 'RustRover', 'Aqua', 'AndroidStudio'
+)
+
+
+def directory_mtime(path: Path) -> Optional[int]:
+    """Modification time (ns) of a directory, or None when it is missing or not a directory."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns if S_ISDIR(stat.st_mode) else None
+
+
+class MatterhornDirectoryCache:
+    """Per-root list of .matterhorn directories plus the mtimes of the directories listed to find them.
+
+    Creating or removing an IDE, project or matterhorn directory changes the
+    mtime of its parent, so the list stays valid while none of those changed.
+    Each root has its own cache file, so a change under one root (or a
+    mounted root that is briefly missing) does not force a rescan of the others.
+    """
+
+    @staticmethod
+    def cache_path(root: Path) -> Path:
+        digest = hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:20]
+        return data_path('junie-directories', f"{digest}.json")
+
+    def load(self, root: Path) -> Optional[List[Path]]:
+        """Cached directories for this root, or None when anything watched changed."""
+        try:
+            with open(self.cache_path(root), 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('root') != str(root):
+            return None
+        for path, mtime in data.get('watched', {}).items():
+            if directory_mtime(Path(path)) != mtime:
+                return None
+        return [Path(path) for path in data.get('matterhorn', [])]
+
+    def save(self, root: Path, watched: Dict[str, Optional[int]], matterhorn_dirs: List[Path]) -> None:
+        data = {
+            'root': str(root),
+            'watched': watched,
+            'matterhorn': [str(path) for path in matterhorn_dirs],
+        }
+        cache_path = self.cache_path(root)
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
 
 
-class JunieSessionsParser:
+class JunieSessionsParser(BaseSessionParser):
     """Parse Junie/Matterhorn sessions to extract work activities."""
 
-    def __init__(self, jetbrains_cache_dir: str = "~/Library/Caches/JetBrains"):
-        self.cache_dir = Path(jetbrains_cache_dir).expanduser()
+    source_name = 'junie'
+    work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook', 'dbricks']
+    personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles', 'test', 'demo']
+    trivial_patterns = [
+        'formatting',
+        'typo',
+        'whitespace',
+        'indentation',
+        'rename variable',
+        'console.log',
+        '.gitignore',
+        'configuration',
+        'settings.json'
+    ]
+
+    # Chain documents are rewritten in place as tasks progress, so copies under
+    # several roots share an id but not a content prefix; the id alone decides
+    dedupe_by_content = False
+
+    def __init__(self, jetbrains_cache_dir: Union[str, List[str], None] = None):
+        if not jetbrains_cache_dir:
+            roots = jetbrains_cache_roots()
+        elif isinstance(jetbrains_cache_dir, str):
+            roots = [jetbrains_cache_dir]
+        else:
+            roots = jetbrains_cache_dir
+        self.cache_dirs = [Path(root).expanduser() for root in roots]
+        self.cache_dir = self.cache_dirs[0] if self.cache_dirs else Path()
+        self.directory_cache = MatterhornDirectoryCache()
 
     def find_matterhorn_directories(self) -> List[Path]:
-        """Find all .matterhorn directories across all IntelliJ versions."""
-        matterhorn_dirs = []
+        """Find all .matterhorn directories across JetBrains IDEs and cache roots."""
+        return scan_roots(self.cache_dirs, self.find_in_root)
 
-        if not self.cache_dir.exists():
+    def find_in_root(self, cache_dir: Path) -> List[Path]:
+        """Find the .matterhorn directories of one cache root.
+
+        The result is cached with the mtimes of every directory it was read
+        from; while none of them changed, no directory listing is repeated.
+        """
+        cached = self.directory_cache.load(cache_dir)
+        if cached is not None:
+            return cached
+
+        matterhorn_dirs = []
+        watched: Dict[str, Optional[int]] = {str(cache_dir): directory_mtime(cache_dir)}
+        if watched[str(cache_dir)] is None:
+            self.directory_cache.save(cache_dir, watched, matterhorn_dirs)
             return matterhorn_dirs
 
-        # Search in IntelliJIdea* directories
-        for intellij_dir in self.cache_dir.glob("IntelliJIdea*/projects/*"):
-            matterhorn_path = intellij_dir / "matterhorn" / ".matterhorn"
-            if matterhorn_path.exists():
-                matterhorn_dirs.append(matterhorn_path)
+        # Every IDE family keeps per-project caches under <IDE><version>/projects/
+        for ide_dir in cache_dir.iterdir():
+            if not ide_dir.name.startswith(JETBRAINS_IDE_PREFIXES):
+                continue
+            projects_dir = ide_dir / "projects"
+            watched[str(ide_dir)] = directory_mtime(ide_dir)
+            watched[str(projects_dir)] = directory_mtime(projects_dir)
+            if watched[str(projects_dir)] is None:
+                continue
+
+            for project_dir in projects_dir.iterdir():
+                matterhorn_parent = project_dir / "matterhorn"
+                watched[str(project_dir)] = directory_mtime(project_dir)
+                watched[str(matterhorn_parent)] = directory_mtime(matterhorn_parent)
+                matterhorn_path = matterhorn_parent / ".matterhorn"
+                if watched[str(matterhorn_parent)] is not None and matterhorn_path.exists():
+                    matterhorn_dirs.append(matterhorn_path)
 
+        self.directory_cache.save(cache_dir, watched, matterhorn_dirs)
         return matterhorn_dirs
 
     def extract_project_from_path(self, matterhorn_path: Path) -> str:
@@ -50,39 +172,13 @@ class JunieSessionsParser:
 
         return "unknown"
 
-    def is_work_project(self, project_name: str) -> bool:
-        """Determine if a project is work-related based on naming patterns."""
-        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook', 'dbricks']
-        personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles', 'test', 'demo']
-
-        project_lower = project_name.lower()
-
-        # Exclude personal/config projects
-        if any(indicator in project_lower for indicator in personal_indicators):
-            return False
-
-        # Include work projects
-        if any(indicator in project_lower for indicator in work_indicators):
-            return True
-
-        # Default to including if uncertain
-        return True
-
     def parse_chain_metadata(self, chain_file: Path) -> Optional[Dict[str, Any]]:
         """Parse chain metadata JSON file."""
-        try:
-            with open(chain_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
+        return read_json(chain_file)
 
     def parse_task_file(self, task_file: Path) -> Optional[Dict[str, Any]]:
         """Parse task JSON file."""
-        try:
-            with open(task_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return None
+        return read_json(task_file)
 
     def extract_user_messages(self, task_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract user messages and responses from task data."""
@@ -182,57 +278,59 @@ class JunieSessionsParser:
 
     def is_trivial_activity(self, description: str) -> bool:
         """Determine if an activity is trivial based on content."""
-        trivial_patterns = [
-            'formatting',
-            'typo',
-            'whitespace',
-            'indentation',
-            'rename variable',
-            'console.log',
-            '.gitignore',
-            'configuration',
-            'settings.json'
-        ]
-
-        description_lower = description.lower()
-        return any(pattern in description_lower for pattern in trivial_patterns)
+        return self.matches_trivial_pattern(description)
 
-    def parse_chains_in_directory(self, matterhorn_dir: Path, since: datetime) -> List[Dict[str, Any]]:
-        """Parse all chains (conversation threads) in a matterhorn directory."""
-        activities = []
+    # --- engine stages ----------------------------------------------------
+
+    def discover_chains(self, matterhorn_dir: Path, project_name: Optional[str] = None) -> List[SessionUnit]:
+        """List the chain metadata files of one matterhorn directory."""
         issues_dir = matterhorn_dir / "issues"
 
         if not issues_dir.exists():
-            return activities
+            return []
 
-        # Iterate through all chain JSON files
-        for chain_file in issues_dir.glob("chain-*.json"):
-            chain_metadata = self.parse_chain_metadata(chain_file)
+        if project_name is None:
+            project_name = self.extract_project_from_path(matterhorn_dir)
+        return [SessionUnit(chain_file, project_name) for chain_file in issues_dir.glob("chain-*.json")]
 
-            if not chain_metadata:
-                continue
+    def discover(self, since: datetime) -> List[SessionUnit]:
+        """Find chain files across all matterhorn directories."""
+        units = []
+        for matterhorn_dir in self.find_matterhorn_directories():
+            project_name = self.extract_project_from_path(matterhorn_dir)
 
-            # Check timestamp
-            created_str = chain_metadata.get('created')
-            if not created_str:
+            # Skip non-work projects before listing their chains
+            if not self.is_work_project(project_name):
                 continue
 
-            try:
-                created_time = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
-                if created_time < since:
-                    continue
-            except (ValueError, AttributeError):
-                continue
+            units.extend(self.discover_chains(matterhorn_dir, project_name))
+        return units
+
+    def decode(self, unit: SessionUnit, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        # A chain is a single metadata document; its tasks are read in extract
+        chain_metadata = self.parse_chain_metadata(unit.path)
+        return [chain_metadata] if chain_metadata else []
+
+    def entry_time(self, entry: Dict[str, Any]) -> Optional[datetime]:
+        return parse_timestamp(entry.get('created'))
 
+    def extract(
+        self,
+        entries: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        requests = []
+
+        for chain_metadata in entries:
             chain_name = chain_metadata.get('name', 'Unnamed task')
             chain_id = chain_metadata['id']['id']
 
-            # Skip trivial activities
+            # Skip trivial chains before reading any of their task files
             if self.is_trivial_activity(chain_name):
                 continue
 
             # Parse task files in this chain
-            chain_dir = issues_dir / f"chain-{chain_id}"
+            chain_dir = unit.path.parent / f"chain-{chain_id}"
 
             if not chain_dir.exists():
                 continue
@@ -245,8 +343,6 @@ class JunieSessionsParser:
 
                 # Extract messages and tools
                 messages = self.extract_user_messages(task_data)
-                tools = self.extract_tool_uses(task_data)
-                files = self.extract_files_from_context(task_data)
 
                 # Combine relevant messages into summary
                 summary_parts = [chain_name]
@@ -256,40 +352,78 @@ class JunieSessionsParser:
                 if user_msgs:
                     summary_parts.append(user_msgs[0][:100])  # First user message
 
-                activities.append({
-                    'timestamp': created_str,
-                    'request': ' - '.join(summary_parts),
-                    'tools': tools,
-                    'files': files,
+                # Keep bounded previews of the assistant's plans and next steps for search
+                plans = [
+                    bound_text(m['text'])[0] for m in messages
+                    if m['type'] == 'assistant_plan' or m['type'] == 'assistant_action'
+                ][:MAX_PLANS_PER_TASK]
+
+                # The summary only keeps 100 chars of the first message; point at the rest
+                locator = None
+                if user_msgs and len(user_msgs[0]) > 100:
+                    locator = {'file': str(task_file), 'offset': 0, 'length': -1}
+
+                requests.append({
+                    'timestamp': chain_metadata['created'],
+                    'text': ' - '.join(summary_parts),
+                    'tools': self.extract_tool_uses(task_data),
+                    'files': self.extract_files_from_context(task_data),
                     'chain_name': chain_name,
-                    'state': chain_metadata.get('state', 'Unknown')
+                    'state': chain_metadata.get('state', 'Unknown'),
+                    'plans': plans,
+                    'locator': locator
                 })
 
-        return activities
-
-    def get_work_summary(self, since_hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
-        """Get work summary from all Junie sessions since the given number of hours ago."""
-        from datetime import timezone
-        since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
-        summary = defaultdict(list)
-
-        # Find all matterhorn directories
-        matterhorn_dirs = self.find_matterhorn_directories()
-
-        for matterhorn_dir in matterhorn_dirs:
-            project_name = self.extract_project_from_path(matterhorn_dir)
-
-            # Skip non-work projects
-            if not self.is_work_project(project_name):
-                continue
-
-            # Parse chains/sessions
-            activities = self.parse_chains_in_directory(matterhorn_dir, since)
+        # Tools are already grouped per task, so there is nothing to correlate
+        return requests, []
+
+    def correlate(
+        self,
+        requests: List[Dict[str, Any]],
+        tool_uses: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        return [(request, []) for request in requests]
+
+    def emit(
+        self,
+        request: Dict[str, Any],
+        tool_uses: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Dict[str, Any]:
+        activity = {
+            'timestamp': request['timestamp'],
+            'request': request['text'],
+            'tools': request['tools'],
+            'files': request['files'],
+            'chain_name': request['chain_name'],
+            'state': request['state'],
+            'plans': request['plans']
+        }
+        if request.get('locator'):
+            activity['request_locator'] = request['locator']
+        return activity
+
+    def load_request_body(self, locator: Dict[str, Any]) -> Optional[str]:
+        """Rebuild a task's request with the full first user message."""
+        task_file = Path(locator['file'])
+        task_data = self.parse_task_file(task_file)
+        if not task_data:
+            return None
 
-            if activities:
-                summary[project_name].extend(activities)
+        # Tasks live in issues/chain-<id>/, next to issues/chain-<id>.json
+        chain_metadata = self.parse_chain_metadata(task_file.parent.with_suffix('.json')) or {}
+        messages = self.extract_user_messages(task_data)
+        user_msgs = [m['text'] for m in messages if m['type'] == 'user_request' or m['type'] == 'user_response']
+        parts = [chain_metadata.get('name', 'Unnamed task')] + user_msgs[:1]
+        return ' - '.join(parts)
 
-        return dict(summary)
+    def parse_chains_in_directory(self, matterhorn_dir: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse all chains (conversation threads) in a matterhorn directory."""
+        engine = self.create_engine()
+        activities = []
+        for unit in self.discover_chains(matterhorn_dir):
+            activities.extend(engine.parse_unit(unit, since))
+        return activities
 
 
 def main():
@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+"""
+Shared streaming parsing engine for AI assistant session sources.
+
+Every source runs through the same pipeline:
+
+    discover -> read -> decode -> extract -> correlate -> classify -> emit
+
+Source parsers subclass BaseSessionParser and only supply the
+format-specific pieces (where sessions live, how entries map to requests
+and tool uses, and what an activity record looks like). Reading, timestamp
+filtering, tool correlation and project/trivial classification live here,
+so improvements to them apply to all sources at once.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from deadline import CHECK_INTERVAL, Deadline
+from session_io import (
+    MAX_RECORD_BYTES, READ_ERRORS, ArchiveBoundsCache, is_compressed, iter_session_lines, missing_codec,
+    open_session_file, session_fingerprint, session_stem
+)
+from time_index import TimeIndex
+
+# Activities keep at most this much request text; the full body stays on
+# disk and is fetched through the activity's request_locator on demand
+MAX_PREVIEW_CHARS = 1000
+
+# Threads listing session roots at once
+MAX_SCAN_WORKERS = 8
+
+# Key under which decode() records where an entry came from in its file
+LOCATOR_KEY = '_locator'
+
+# Key marking the stand-in of a record too large to decode (value: its byte length)
+OVERSIZED_KEY = '_oversized'
+
+# Top-level fields recovered from the leading bytes of an oversized record
+PEEK_PATTERNS = {
+    'type': re.compile(rb'"type"\s*:\s*"([^"\\]{1,64})"'),
+    'timestamp': re.compile(rb'"timestamp"\s*:\s*"([^"\\]{1,64})"'),
+}
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp, returning None when missing or malformed."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Session files are written in UTC; treat naive timestamps as such
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def peek_record(head: bytes) -> Dict[str, Any]:
+    """Stand-in for an oversized record: its type and timestamp, read from its first bytes."""
+    entry: Dict[str, Any] = {}
+    for key, pattern in PEEK_PATTERNS.items():
+        match = pattern.search(head)
+        if match:
+            entry[key] = match.group(1).decode('utf-8', 'replace')
+    return entry
+
+
+def iter_jsonl_records(
+    filepath: Path,
+    start: int = 0,
+    max_record_bytes: int = MAX_RECORD_BYTES
+) -> Iterator[Tuple[int, int, Any]]:
+    """Stream (byte offset, byte length, entry) from a JSONL file.
+
+    Blank and malformed lines are skipped; compressed files are decompressed
+    on the fly, and a corrupt archive yields whatever was readable. Offsets
+    (into the decompressed stream) let activities point back at the exact
+    line they came from (see read_jsonl_record). Reading begins at start,
+    which must be the offset of a line. Lines over max_record_bytes are not
+    decoded; they yield a peek_record() stand-in tagged with OVERSIZED_KEY.
+    """
+    try:
+        for offset, length, data in iter_session_lines(filepath, start, max_record_bytes):
+            if len(data) < length:
+                entry = peek_record(data)
+                entry[OVERSIZED_KEY] = length
+                yield offset, length, entry
+                continue
+            stripped = data.strip()
+            if stripped:
+                try:
+                    yield offset, length, json.loads(stripped)
+                except ValueError:
+                    pass
+    except READ_ERRORS:
+        return
+
+
+def iter_jsonl(filepath: Path) -> Iterator[Dict[str, Any]]:
+    """Stream entries from a JSONL file, skipping blank and malformed lines."""
+    for _, _, entry in iter_jsonl_records(filepath):
+        yield entry
+
+
+def read_jsonl_record(filepath: Path, offset: int, length: int) -> Optional[Any]:
+    """Decode the single JSONL line at a byte offset, or None if it is gone."""
+    try:
+        with open_session_file(filepath) as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+    except READ_ERRORS + (ValueError,):
+        return None
+
+
+def bound_text(text: str, limit: int = MAX_PREVIEW_CHARS) -> Tuple[str, bool]:
+    """Return (preview, truncated) with the preview at most limit characters."""
+    if len(text) <= limit:
+        return text, False
+    return text[:limit], True
+
+
+def make_locator(unit_path: Path, locator: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Activity-level locator of a truncated request body, or None when complete."""
+    if not locator or not locator.get('truncated'):
+        return None
+    return {'file': str(unit_path), 'offset': locator['offset'], 'length': locator['length']}
+
+
+def read_json(filepath: Path) -> Optional[Any]:
+    """Read a whole JSON document, returning None when missing or malformed."""
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def contains_any(text: str, patterns: Iterable[str]) -> bool:
+    """Case-insensitive substring match against a list of patterns."""
+    text_lower = text.lower()
+    return any(pattern in text_lower for pattern in patterns)
+
+
+def correlate_by_window(
+    requests: List[Dict[str, Any]],
+    tool_uses: List[Dict[str, Any]],
+    window_seconds: float
+) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Pair each request with the tool uses within +/- window_seconds of it.
+
+    Tool uses are sorted once and each request does two binary searches,
+    so the pass is O((requests + tools) log tools) instead of
+    O(requests x tools). Related tools keep their original order.
+    """
+    timed_tools = []
+    for index, tool_use in enumerate(tool_uses):
+        tool_time = parse_timestamp(tool_use.get('timestamp'))
+        if tool_time is not None:
+            timed_tools.append((tool_time, index))
+    timed_tools.sort()
+    times = [t for t, _ in timed_tools]
+    window = timedelta(seconds=window_seconds)
+
+    pairs = []
+    for request in requests:
+        request_time = parse_timestamp(request.get('timestamp'))
+        if request_time is None:
+            pairs.append((request, []))
+            continue
+        lo = bisect_right(times, request_time - window)
+        hi = bisect_left(times, request_time + window)
+        indices = sorted(index for _, index in timed_tools[lo:hi])
+        pairs.append((request, [tool_uses[i] for i in indices]))
+    return pairs
+
+
+def scan_roots(roots: List[Path], scan: Callable[[Path], List[Any]]) -> List[Any]:
+    """Concatenate scan(root) over several session roots, keeping root order.
+
+    Extra roots are usually mounted homes or container volumes, where
+    listing directories is I/O bound, so several roots are scanned on a
+    thread pool.
+    """
+    if len(roots) <= 1:
+        return [item for root in roots for item in scan(root)]
+    with ThreadPoolExecutor(max_workers=min(len(roots), MAX_SCAN_WORKERS)) as executor:
+        return [item for items in executor.map(scan, roots) for item in items]
+
+
+def dedupe_units(units: List['SessionUnit'], by_content: bool = True) -> Tuple[List['SessionUnit'], int]:
+    """Drop copies of one session found under several roots; returns (kept, dropped).
+
+    Units with the same session id (file name without compression suffix)
+    are copies of one session when the head of one is a prefix of the
+    other's (or always, without by_content). For append-only files the most
+    complete copy is kept: a plain file over an archive, then the largest,
+    then the newest. Without by_content (documents rewritten in place,
+    which can shrink) the newest copy is kept. Units with a unique id are
+    never opened.
+    """
+    def completeness(position: int) -> Tuple[Any, ...]:
+        mtime, size = ParsingEngine.unit_stat(units[position])
+        if not by_content:
+            return mtime, size
+        return not is_compressed(units[position].path), size, mtime
+
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for position, unit in enumerate(units):
+        groups[session_stem(unit.path)].append(position)
+
+    dropped = set()
+    for positions in groups.values():
+        if len(positions) < 2:
+            continue
+        if by_content:
+            heads = {position: session_fingerprint(units[position].path) for position in positions}
+            # Longest heads first, so each copy joins the session it was synced from;
+            # unreadable copies are kept on their own
+            copies: List[List[int]] = []
+            longest: List[Optional[bytes]] = []
+            for position in sorted(positions, key=lambda p: len(heads[p] or b''), reverse=True):
+                head = heads[position]
+                match = None if head is None else next(
+                    (i for i, other in enumerate(longest) if other is not None and other.startswith(head)), None
+                )
+                if match is None:
+                    copies.append([position])
+                    longest.append(head)
+                else:
+                    copies[match].append(position)
+        else:
+            copies = [positions]
+        for same in copies:
+            best = max(same, key=completeness)
+            dropped.update(position for position in same if position != best)
+
+    return [unit for position, unit in enumerate(units) if position not in dropped], len(dropped)
+
+
+class SessionUnit:
+    """One discoverable piece of session data (usually a single file)."""
+
+    __slots__ = ('path', 'project', 'meta')
+
+    def __init__(self, path: Path, project: Optional[str] = None, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.project = project
+        self.meta = meta or {}
+
+    def __repr__(self) -> str:
+        return f"SessionUnit({str(self.path)!r}, project={self.project!r})"
+
+
+class BaseSessionParser(ABC):
+    """Base class for source parsers plugged into the ParsingEngine.
+
+    Subclasses set the indicator/pattern lists, implement discover, extract
+    and emit, and may override the other stage hooks below. The default
+    read/decode stage streams JSONL entries.
+    """
+
+    source_name = ''
+    work_indicators: List[str] = []
+    personal_indicators: List[str] = []
+    trivial_patterns: List[str] = []
+    correlation_window_seconds = 300
+    max_record_bytes = MAX_RECORD_BYTES
+    # Copies of a session id under several roots are compared by content; sources whose
+    # session documents are rewritten in place treat every copy of an id as the same session
+    dedupe_by_content = True
+
+    # --- shared helpers -------------------------------------------------
+
+    def parse_jsonl_file(self, filepath: Path) -> List[Dict[str, Any]]:
+        """Parse a JSONL file and return list of entries."""
+        return list(iter_jsonl(filepath))
+
+    def is_work_project(self, project_name: str) -> bool:
+        """Determine if a project is work-related based on naming patterns."""
+        # Exclude personal/config projects
+        if contains_any(project_name, self.personal_indicators):
+            return False
+
+        # Include work projects
+        if contains_any(project_name, self.work_indicators):
+            return True
+
+        # Default to including if uncertain
+        return True
+
+    def matches_trivial_pattern(self, text: str) -> bool:
+        """Check text against the source's trivial-activity patterns."""
+        return contains_any(text, self.trivial_patterns)
+
+    # --- pipeline stages --------------------------------------------------
+
+    @abstractmethod
+    def discover(self, since: datetime) -> Iterable[SessionUnit]:
+        """Yield the session units that may hold entries at or after since."""
+
+    def decode(self, unit: SessionUnit, since: Optional[datetime] = None) -> Iterable[Dict[str, Any]]:
+        """Read and decode a unit into entries, tagging each with its byte range.
+
+        Large plain files start at the offset their sidecar time index gives
+        for since (skipping only entries older than it) and extend the index
+        with what is read past its end.
+        """
+        index = None
+        if since is not None and not is_compressed(unit.path):
+            index = TimeIndex.for_file(unit.path)
+        start = index.start_offset(since.timestamp()) if index is not None else 0
+
+        try:
+            for offset, length, entry in iter_jsonl_records(unit.path, start, self.max_record_bytes):
+                if not isinstance(entry, dict):
+                    continue
+                if index is not None:
+                    entry_time = self.entry_time(entry)
+                    index.observe(offset, length, entry_time.timestamp() if entry_time else None)
+                entry[LOCATOR_KEY] = {'offset': offset, 'length': length, 'truncated': False}
+                yield entry
+        finally:
+            # A read stopped early (deadline) still indexed a valid prefix
+            if index is not None:
+                index.save()
+
+    def compact_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop or truncate bulky fields of an in-window entry before it is kept.
+
+        Sources that truncate text should set entry[LOCATOR_KEY]['truncated']
+        so the emitted activity carries a locator to the full body.
+        """
+        return entry
+
+    def load_request_body(self, locator: Dict[str, Any]) -> Optional[str]:
+        """Fetch the full request text behind an activity's request_locator."""
+        return None
+
+    def entry_time(self, entry: Dict[str, Any]) -> Optional[datetime]:
+        """Timestamp used to filter an entry against the time window."""
+        return parse_timestamp(entry.get('timestamp'))
+
+    @abstractmethod
+    def extract(
+        self,
+        entries: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Extract (requests, tool_uses) from in-window entries.
+
+        Anything emit needs beyond the unit itself (such as a session's
+        working directory) travels on the request dicts.
+        """
+
+    def correlate(
+        self,
+        requests: List[Dict[str, Any]],
+        tool_uses: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Assign tool uses to requests."""
+        return correlate_by_window(requests, tool_uses, self.correlation_window_seconds)
+
+    def classify(self, request: Dict[str, Any], tool_uses: List[Dict[str, Any]]) -> bool:
+        """Return True when the request should be kept as an activity."""
+        return True
+
+    @abstractmethod
+    def emit(
+        self,
+        request: Dict[str, Any],
+        tool_uses: List[Dict[str, Any]],
+        unit: SessionUnit
+    ) -> Dict[str, Any]:
+        """Build the activity record for a kept request."""
+
+    def activity_project(self, activity: Dict[str, Any], unit: SessionUnit) -> str:
+        """Project an emitted activity belongs to."""
+        return unit.project or activity.get('project') or 'unknown'
+
+    # --- entry points -----------------------------------------------------
+
+    def create_engine(self) -> 'ParsingEngine':
+        return ParsingEngine(self)
+
+    def get_work_summary(
+        self,
+        since_hours: int = 24,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get work summary since the given number of hours ago.
+
+        With a deadline, files are read newest-first and whatever was not
+        finished in time is recorded on the deadline as incomplete.
+        """
+        since = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+        return self.create_engine().run(since, deadline=deadline)
+
+
+class ParsingEngine:
+    """Run a BaseSessionParser through the shared pipeline.
+
+    Compressed units are decoded on a thread pool (decompression releases
+    the GIL), and archives whose cached time bounds end before the window
+    are skipped without being opened.
+    """
+
+    def __init__(self, source: BaseSessionParser, workers: Optional[int] = None):
+        self.source = source
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.stats: Dict[str, float] = defaultdict(float)
+        self._stats_lock = threading.Lock()
+        self._archive_bounds: Optional[ArchiveBoundsCache] = None
+        self._archive_bounds_lock = threading.Lock()
+        # Archive names per decompression package that is not installed
+        self.unreadable: Dict[str, List[str]] = defaultdict(list)
+
+    def count(self, key: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    @property
+    def archive_bounds(self) -> ArchiveBoundsCache:
+        # Worker threads share one cache; a second instance would lose the other's puts
+        if self._archive_bounds is None:
+            with self._archive_bounds_lock:
+                if self._archive_bounds is None:
+                    self._archive_bounds = ArchiveBoundsCache()
+        return self._archive_bounds
+
+    def filter_entries(
+        self,
+        entries: Iterable[Dict[str, Any]],
+        since: datetime,
+        bounds: Optional[List[Optional[datetime]]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Keep entries whose timestamp is at or after since.
+
+        When bounds is given it is updated in place to [first, last] entry time.
+        Returns (kept, complete); complete is False when the deadline expired
+        before the entries were exhausted.
+        """
+        kept = []
+        seen = 0
+        complete = True
+        for entry in entries:
+            seen += 1
+            if deadline is not None and seen % CHECK_INTERVAL == 0 and deadline.expired():
+                complete = False
+                break
+            entry_time = self.source.entry_time(entry)
+            if entry_time is not None and bounds is not None:
+                if bounds[0] is None or entry_time < bounds[0]:
+                    bounds[0] = entry_time
+                if bounds[1] is None or entry_time > bounds[1]:
+                    bounds[1] = entry_time
+            if OVERSIZED_KEY in entry:
+                # Never decoded; the stand-in only carries its time for the bounds above
+                self.count('oversized_skipped')
+                self.count('oversized_bytes', entry[OVERSIZED_KEY])
+                continue
+            if entry_time is None:
+                continue
+            if entry_time >= since:
+                # Only compacted entries are retained, so pasted logs are not held
+                kept.append(self.source.compact_entry(entry))
+        if not complete and hasattr(entries, 'close'):
+            entries.close()
+        self.count('entries', seen)
+        return kept, complete
+
+    def parse_unit(
+        self,
+        unit: SessionUnit,
+        since: datetime,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """Parse one unit into activities, keeping what was read if the deadline expires."""
+        source = self.source
+        if deadline is not None and deadline.expired():
+            deadline.mark_incomplete(source.source_name, str(unit.path), 'skipped')
+            return []
+        self.count('units')
+
+        bounds = None
+        if is_compressed(unit.path):
+            cached = self.archive_bounds.get(unit.path)
+            if cached is not None and (cached['last'] is None or cached['last'] < since.timestamp()):
+                self.count('archives_skipped')
+                return []
+            codec = missing_codec(unit.path)
+            if codec is not None:
+                with self._stats_lock:
+                    self.unreadable[codec].append(unit.path.name)
+                return []
+            bounds = [None, None]
+
+        entries, complete = self.filter_entries(source.decode(unit, since), since, bounds, deadline)
+        if not complete:
+            deadline.mark_incomplete(source.source_name, str(unit.path), 'partial')
+        elif bounds is not None:
+            self.archive_bounds.put(
+                unit.path,
+                bounds[0].timestamp() if bounds[0] else None,
+                bounds[1].timestamp() if bounds[1] else None
+            )
+        if not entries:
+            return []
+
+        requests, tool_uses = source.extract(entries, unit)
+
+        activities = []
+        for request, related_tools in source.correlate(requests, tool_uses):
+            if not source.classify(request, related_tools):
+                continue
+            activities.append(source.emit(request, related_tools, unit))
+
+        self.count('activities', len(activities))
+        return activities
+
+    def run(
+        self,
+        since: datetime,
+        units: Optional[Iterable[SessionUnit]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse all discovered (or given) units into a per-project summary."""
+        source = self.source
+        summary = defaultdict(list)
+        started = time.perf_counter()
+
+        # Prune units whose project is known up front
+        units = [
+            unit for unit in (source.discover(since) if units is None else units)
+            if unit.project is None or source.is_work_project(unit.project)
+        ]
+        units, duplicates = dedupe_units(units, source.dedupe_by_content)
+        if duplicates:
+            self.count('duplicates_skipped', duplicates)
+            print(f"{source.source_name}: skipped {duplicates} duplicate session copies", file=sys.stderr)
+        if deadline is not None:
+            # The newest sessions matter most when time runs out
+            units.sort(key=lambda unit: self.unit_stat(unit)[0], reverse=True)
+
+        for unit, activities in zip(units, self.parse_units(units, since, deadline)):
+            for activity in activities:
+                project = source.activity_project(activity, unit)
+                if unit.project is None and not source.is_work_project(project):
+                    continue
+                summary[project].append(activity)
+
+        if self._archive_bounds is not None:
+            self._archive_bounds.save()
+        if self.stats['oversized_skipped']:
+            print(
+                f"{source.source_name}: skipped {int(self.stats['oversized_skipped'])} oversized records "
+                f"({self.stats['oversized_bytes'] / (1 << 20):.1f} MB)",
+                file=sys.stderr
+            )
+        for codec, names in sorted(self.unreadable.items()):
+            print(
+                f"{source.source_name}: skipped {len(names)} archives, {codec} is not installed: {', '.join(sorted(names))}",
+                file=sys.stderr
+            )
+        self.count('seconds', time.perf_counter() - started)
+        return dict(summary)
+
+    @staticmethod
+    def unit_stat(unit: SessionUnit) -> Tuple[float, int]:
+        """(mtime, size) of a unit's file, zeros when it cannot be read."""
+        try:
+            stat = os.stat(unit.path)
+        except OSError:
+            return 0.0, 0
+        return stat.st_mtime, stat.st_size
+
+    def parse_units(
+        self,
+        units: List[SessionUnit],
+        since: datetime,
+        deadline: Optional[Deadline] = None
+    ) -> Iterable[List[Dict[str, Any]]]:
+        """Parse units in order, decompressing archives in parallel when there are several."""
+        if self.workers > 1 and sum(1 for unit in units if is_compressed(unit.path)) > 1:
+            return self.parse_units_in_parallel(units, since, deadline)
+        if deadline is None:
+            return (self.parse_unit(unit, since) for unit in units)
+        return self.parse_units_with_shares(units, since, deadline)
+
+    def parse_units_in_parallel(
+        self,
+        units: List[SessionUnit],
+        since: datetime,
+        deadline: Optional[Deadline] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Parse units on the thread pool, each within its share of the time left when it starts.
+
+        Shares follow parse_units_with_shares over the units not started
+        yet, scaled by the worker count since that many run at once.
+        """
+        sizes = [self.unit_stat(unit)[1] for unit in units] if deadline is not None else []
+        lock = threading.Lock()
+        pending = {'bytes': sum(sizes), 'units': len(units)}
+
+        def parse(position: int) -> List[Dict[str, Any]]:
+            if deadline is None:
+                return self.parse_unit(units[position], since)
+            with lock:
+                size = sizes[position]
+                fraction = max(size / pending['bytes'] if pending['bytes'] else 0.0, 1 / pending['units'])
+                pending['bytes'] -= size
+                pending['units'] -= 1
+            return self.parse_unit(units[position], since, deadline.share(fraction * self.workers))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(parse, range(len(units))))
+
+    def parse_units_with_shares(
+        self,
+        units: List[SessionUnit],
+        since: datetime,
+        deadline: Deadline
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Parse units sequentially, each within its share of the remaining time.
+
+        A unit's share is proportional to its size, but at least an even
+        split of what is left, so one slow file cannot use up the budget.
+        """
+        sizes = [self.unit_stat(unit)[1] for unit in units]
+        remaining_bytes = sum(sizes)
+        for position, (unit, size) in enumerate(zip(units, sizes)):
+            fraction = max(size / remaining_bytes if remaining_bytes else 0.0, 1 / (len(units) - position))
+            yield self.parse_unit(unit, since, deadline.share(fraction))
+            remaining_bytes -= size
@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+"""
+Reference implementations of the session parsers, frozen as oracles.
+
+These are the original single-pass parsers, kept verbatim apart from the
+class names and their get_work_summary()/main() drivers, so that
+differential_harness.py can check the optimized pipeline against them.
+Do not optimize or fix them: any behaviour change here hides a regression
+in the code they check.
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+class ReferenceClaudeProjectsParser:
+    """Parse Claude Code project sessions to extract work activities."""
+
+    def __init__(self, projects_dir: str = "~/.claude/projects"):
+        self.projects_dir = Path(projects_dir).expanduser()
+
+    def get_project_name(self, project_dir: str) -> str:
+        """Extract human-readable project name from directory name."""
+        # Convert directory names like "-Users-doruchiulan-Projects-blueprint-bp-informatica"
+        # to "bp-informatica"
+        parts = project_dir.split('-')
+        if 'Projects' in parts:
+            idx = parts.index('Projects')
+            return '-'.join(parts[idx+1:]) if idx + 1 < len(parts) else project_dir
+        return project_dir
+
+    def is_work_project(self, project_name: str) -> bool:
+        """Determine if a project is work-related based on naming patterns."""
+        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
+        personal_indicators = ['claude', 'mcp', 'config', 'plugin']
+
+        project_lower = project_name.lower()
+
+        # Exclude personal/config projects
+        if any(indicator in project_lower for indicator in personal_indicators):
+            return False
+
+        # Include work projects
+        if any(indicator in project_lower for indicator in work_indicators):
+            return True
+
+        # Default to including if uncertain
+        return True
+
+    def parse_jsonl_file(self, filepath: Path) -> List[Dict[str, Any]]:
+        """Parse a JSONL file and return list of entries."""
+        entries = []
+        try:
+            with open(filepath, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def extract_user_requests(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract user requests and their timestamps from session entries."""
+        requests = []
+        for entry in entries:
+            if entry.get('type') == 'user' and 'message' in entry:
+                message = entry['message']
+                if isinstance(message, dict) and message.get('role') == 'user':
+                    content = message.get('content', [])
+                    # Extract text from content
+                    text_parts = []
+                    for item in content:
+                        if isinstance(item, dict) and item.get('type') == 'text':
+                            text_parts.append(item.get('text', ''))
+
+                    if text_parts:
+                        requests.append({
+                            'timestamp': entry.get('timestamp'),
+                            'text': ' '.join(text_parts),
+                            'cwd': entry.get('cwd', '')
+                        })
+        return requests
+
+    def extract_tool_uses(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract tool uses from assistant messages."""
+        tool_uses = []
+        for entry in entries:
+            if entry.get('type') == 'assistant' and 'message' in entry:
+                message = entry['message']
+                if isinstance(message, dict):
+                    content = message.get('content', [])
+                    for item in content:
+                        if isinstance(item, dict) and item.get('type') == 'tool_use':
+                            tool_uses.append({
+                                'timestamp': entry.get('timestamp'),
+                                'tool': item.get('name'),
+                                'input': item.get('input', {}),
+                                'cwd': entry.get('cwd', '')
+                            })
+        return tool_uses
+
+    def extract_file_modifications(self, tool_uses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract file modification activities from tool uses."""
+        modifications = []
+        file_tools = ['Edit', 'Write', 'NotebookEdit']
+
+        for tool_use in tool_uses:
+            if tool_use['tool'] in file_tools:
+                file_path = tool_use['input'].get('file_path') or tool_use['input'].get('notebook_path')
+                if file_path:
+                    modifications.append({
+                        'timestamp': tool_use['timestamp'],
+                        'tool': tool_use['tool'],
+                        'file': file_path,
+                        'cwd': tool_use['cwd']
+                    })
+
+        return modifications
+
+    def is_trivial_activity(self, request_text: str, tool_uses: List[Dict[str, Any]]) -> bool:
+        """Determine if an activity is trivial based on content."""
+        trivial_patterns = [
+            'settings.json',
+            '.run.xml',
+            'configuration',
+            'typo',
+            'console.log',
+            'formatting',
+            'rename',
+            '.gitignore',
+            'helper script',
+            'utility script'
+        ]
+
+        request_lower = request_text.lower()
+
+        # Check request text
+        if any(pattern in request_lower for pattern in trivial_patterns):
+            return True
+
+        # Check if only reading files
+        if tool_uses and all(t['tool'] == 'Read' for t in tool_uses):
+            return True
+
+        return False
+
+    def parse_project_sessions(self, project_dir: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse all session files in a project directory since a given datetime."""
+        activities = []
+
+        if not project_dir.exists():
+            return activities
+
+        # Get all .jsonl files
+        for jsonl_file in project_dir.glob('*.jsonl'):
+            # Skip agent files, focus on main sessions
+            if jsonl_file.name.startswith('agent-'):
+                continue
+
+            entries = self.parse_jsonl_file(jsonl_file)
+
+            # Filter entries by timestamp
+            filtered_entries = []
+            for entry in entries:
+                timestamp_str = entry.get('timestamp')
+                if timestamp_str:
+                    try:
+                        entry_time = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                        if entry_time >= since:
+                            filtered_entries.append(entry)
+                    except (ValueError, AttributeError):
+                        continue
+
+            if not filtered_entries:
+                continue
+
+            # Extract user requests and tool uses
+            requests = self.extract_user_requests(filtered_entries)
+            tool_uses = self.extract_tool_uses(filtered_entries)
+
+            # Combine into activities
+            for request in requests:
+                # Find related tool uses (within 5 minutes)
+                request_time = datetime.fromisoformat(request['timestamp'].replace('Z', '+00:00'))
+                related_tools = [
+                    t for t in tool_uses
+                    if abs((datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) - request_time).total_seconds()) < 300
+                ]
+
+                # Skip trivial activities
+                if self.is_trivial_activity(request['text'], related_tools):
+                    continue
+
+                file_mods = self.extract_file_modifications(related_tools)
+                activities.append({
+                    'timestamp': request['timestamp'],
+                    'request': request['text'],
+                    'tools': [t['tool'] for t in related_tools],
+                    'files': file_mods,
+                    'session_file': jsonl_file.name
+                })
+
+        return activities
+
+
+class ReferenceCodexSessionsParser:
+    """Parse Codex sessions to extract work activities."""
+
+    def __init__(self, sessions_dir: str = "~/.codex/sessions"):
+        self.sessions_dir = Path(sessions_dir).expanduser()
+
+    def parse_jsonl_file(self, filepath: Path) -> List[Dict[str, Any]]:
+        """Parse a JSONL file and return list of entries."""
+        entries = []
+        try:
+            with open(filepath, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def extract_project_from_cwd(self, cwd: str) -> str:
+        """Extract project name from working directory."""
+        if not cwd:
+            return "unknown"
+
+        path_parts = Path(cwd).parts
+        if 'Projects' in path_parts:
+            idx = path_parts.index('Projects')
+            if idx + 1 < len(path_parts):
+                # Return the immediate subdirectory after Projects
+                return path_parts[idx + 1]
+
+        # Fallback to last directory
+        return path_parts[-1] if path_parts else "unknown"
+
+    def is_work_project(self, project_name: str) -> bool:
+        """Determine if a project is work-related based on naming patterns."""
+        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook']
+        personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles']
+
+        project_lower = project_name.lower()
+
+        # Exclude personal/config projects
+        if any(indicator in project_lower for indicator in personal_indicators):
+            return False
+
+        # Include work projects
+        if any(indicator in project_lower for indicator in work_indicators):
+            return True
+
+        # Default to including if uncertain
+        return True
+
+    def extract_user_messages(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract user messages from session entries."""
+        messages = []
+
+        for entry in entries:
+            if entry.get('type') == 'event_msg':
+                payload = entry.get('payload', {})
+                if payload.get('type') == 'user_message':
+                    message_text = payload.get('message', '')
+                    timestamp = entry.get('timestamp')
+
+                    # Skip IDE context messages
+                    if message_text.startswith('# Context from my IDE setup:'):
+                        # Extract actual user request
+                        if '## My request for Codex:' in message_text:
+                            request = message_text.split('## My request for Codex:')[1].strip()
+                            messages.append({
+                                'timestamp': timestamp,
+                                'text': request
+                            })
+                    else:
+                        messages.append({
+                            'timestamp': timestamp,
+                            'text': message_text
+                        })
+
+        return messages
+
+    def extract_tool_uses(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract tool/function calls from session entries."""
+        tool_uses = []
+
+        for entry in entries:
+            if entry.get('type') == 'response_item':
+                payload = entry.get('payload', {})
+
+                # Check for function calls
+                if payload.get('type') == 'function_call':
+                    tool_name = payload.get('name')
+                    arguments = payload.get('arguments', '{}')
+
+                    try:
+                        args_dict = json.loads(arguments) if isinstance(arguments, str) else arguments
+                    except json.JSONDecodeError:
+                        args_dict = {}
+
+                    tool_uses.append({
+                        'timestamp': entry.get('timestamp'),
+                        'tool': tool_name,
+                        'input': args_dict
+                    })
+
+        return tool_uses
+
+    def extract_file_operations(self, tool_uses: List[Dict[str, Any]]) -> List[str]:
+        """Extract file paths from tool uses."""
+        files = []
+        file_tools = ['write_file', 'read_file', 'edit_file', 'shell_command']
+
+        for tool_use in tool_uses:
+            if tool_use['tool'] in file_tools:
+                input_data = tool_use['input']
+
+                # Extract file paths from various input formats
+                if 'path' in input_data:
+                    files.append(input_data['path'])
+                elif 'file_path' in input_data:
+                    files.append(input_data['file_path'])
+                elif tool_use['tool'] == 'shell_command' and 'command' in input_data:
+                    # Try to extract files from command
+                    command = input_data['command']
+                    # Simple heuristic: look for file patterns
+                    if any(ext in command for ext in ['.py', '.java', '.ts', '.json', '.xml']):
+                        files.append(f"<from command: {command[:50]}...>")
+
+        return files
+
+    def is_trivial_activity(self, message_text: str, tool_uses: List[Dict[str, Any]]) -> bool:
+        """Determine if an activity is trivial based on content."""
+        trivial_patterns = [
+            'settings.json',
+            '.run.xml',
+            'configuration',
+            'typo',
+            'console.log',
+            'formatting',
+            'rename',
+            '.gitignore',
+            'helper script',
+            'utility script',
+            'ls -la',
+            'cd ',
+            'pwd'
+        ]
+
+        message_lower = message_text.lower()
+
+        # Check message text
+        if any(pattern in message_lower for pattern in trivial_patterns):
+            return True
+
+        # Check if only reading or listing
+        if tool_uses:
+            tool_names = [t['tool'] for t in tool_uses]
+            if all(name in ['read_file', 'shell_command'] for name in tool_names):
+                # Check if shell commands are just ls/cd/pwd
+                commands = [
+                    t['input'].get('command', '') for t in tool_uses
+                    if t['tool'] == 'shell_command'
+                ]
+                if commands and all(
+                    cmd.startswith(('ls', 'cd', 'pwd', 'cat'))
+                    for cmd in commands
+                ):
+                    return True
+
+        return False
+
+    def parse_session_file(self, session_file: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse a single session file and extract activities."""
+        activities = []
+        entries = self.parse_jsonl_file(session_file)
+
+        if not entries:
+            return activities
+
+        # Filter by timestamp
+        filtered_entries = [
+            e for e in entries
+            if e.get('timestamp') and
+            datetime.fromisoformat(e['timestamp'].replace('Z', '+00:00')) >= since
+        ]
+
+        if not filtered_entries:
+            return activities
+
+        # Get working directory from session metadata
+        cwd = None
+        for entry in filtered_entries:
+            if entry.get('type') == 'session_meta':
+                payload = entry.get('payload', {})
+                cwd = payload.get('cwd')
+                break
+
+        project = self.extract_project_from_cwd(cwd) if cwd else "unknown"
+
+        # Extract messages and tool uses
+        messages = self.extract_user_messages(filtered_entries)
+        tool_uses = self.extract_tool_uses(filtered_entries)
+
+        # Combine into activities
+        for message in messages:
+            msg_time = datetime.fromisoformat(message['timestamp'].replace('Z', '+00:00'))
+
+            # Find related tool uses (within 5 minutes)
+            related_tools = [
+                t for t in tool_uses
+                if abs((datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) - msg_time).total_seconds()) < 300
+            ]
+
+            # Skip trivial activities
+            if self.is_trivial_activity(message['text'], related_tools):
+                continue
+
+            # Skip empty or very short messages
+            if len(message['text'].strip()) < 5:
+                continue
+
+            files = self.extract_file_operations(related_tools)
+
+            activities.append({
+                'timestamp': message['timestamp'],
+                'request': message['text'],
+                'tools': [t['tool'] for t in related_tools],
+                'files': files,
+                'project': project,
+                'cwd': cwd,
+                'session_file': session_file.name
+            })
+
+        return activities
+
+    def get_sessions_for_date(self, target_date: date) -> List[Path]:
+        """Get all session files for a specific date."""
+        year = target_date.year
+        month = target_date.month
+        day = target_date.day
+
+        session_dir = self.sessions_dir / str(year) / f"{month:02d}" / f"{day:02d}"
+
+        if not session_dir.exists():
+            return []
+
+        return list(session_dir.glob("rollout-*.jsonl"))
+
+
+class ReferenceJunieSessionsParser:
+    """Parse Junie/Matterhorn sessions to extract work activities."""
+
+    def __init__(self, jetbrains_cache_dir: str = "~/Library/Caches/JetBrains"):
+        self.cache_dir = Path(jetbrains_cache_dir).expanduser()
+
+    def find_matterhorn_directories(self) -> List[Path]:
+        """Find all .matterhorn directories across all IntelliJ versions."""
+        matterhorn_dirs = []
+
+        if not self.cache_dir.exists():
+            return matterhorn_dirs
+
+        # Search in IntelliJIdea* directories
+        for intellij_dir in self.cache_dir.glob("IntelliJIdea*/projects/*"):
+            matterhorn_path = intellij_dir / "matterhorn" / ".matterhorn"
+            if matterhorn_path.exists():
+                matterhorn_dirs.append(matterhorn_path)
+
+        return matterhorn_dirs
+
+    def extract_project_from_path(self, matterhorn_path: Path) -> str:
+        """Extract project name from matterhorn path."""
+        # Path format: .../projects/{project}.{hash}/matterhorn/.matterhorn
+        parts = matterhorn_path.parts
+
+        try:
+            projects_idx = parts.index("projects")
+            if projects_idx + 1 < len(parts):
+                project_part = parts[projects_idx + 1]
+                # Remove hash suffix: "smile-app.9b05b6ff" -> "smile-app"
+                project_name = project_part.split('.')[0]
+                return project_name
+        except (ValueError, IndexError):
+            pass
+
+        return "unknown"
+
+    def is_work_project(self, project_name: str) -> bool:
+        """Determine if a project is work-related based on naming patterns."""
+        work_indicators = ['blueprint', 'smile-app', 'workbench', 'optimizer', 'converter', 'playbook', 'dbricks']
+        personal_indicators = ['claude', 'mcp', 'config', 'plugin', 'dotfiles', 'test', 'demo']
+
+        project_lower = project_name.lower()
+
+        # Exclude personal/config projects
+        if any(indicator in project_lower for indicator in personal_indicators):
+            return False
+
+        # Include work projects
+        if any(indicator in project_lower for indicator in work_indicators):
+            return True
+
+        # Default to including if uncertain
+        return True
+
+    def parse_chain_metadata(self, chain_file: Path) -> Optional[Dict[str, Any]]:
+        """Parse chain metadata JSON file."""
+        try:
+            with open(chain_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def parse_task_file(self, task_file: Path) -> Optional[Dict[str, Any]]:
+        """Parse task JSON file."""
+        try:
+            with open(task_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def extract_user_messages(self, task_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract user messages and responses from task data."""
+        messages = []
+
+        # Get initial context/description
+        context = task_data.get('context', {})
+        description = context.get('description', '')
+
+        if description and len(description) > 5:
+            created = task_data.get('created')
+            messages.append({
+                'timestamp': created,
+                'type': 'user_request',
+                'text': description
+            })
+
+        # Extract from observations
+        observations = task_data.get('finalAgentState', {}).get('observations', [])
+
+        for obs in observations:
+            # User responses
+            user_response = obs.get('userResponse', {})
+            if user_response:
+                user_type = user_response.get('type', '')
+
+                # Check for text messages
+                if 'MatterhornUserChatMessage' in user_type:
+                    content = user_response.get('content', '')
+                    if content and len(content) > 5:
+                        messages.append({
+                            'timestamp': obs.get('created'),
+                            'type': 'user_response',
+                            'text': content
+                        })
+
+            # Assistant requests (to understand what was asked/discussed)
+            assistant_request = obs.get('assistantRequest', {})
+            if assistant_request:
+                content = assistant_request.get('content', '')
+
+                # Extract plan and actions from UPDATE tags
+                if '<PLAN>' in content and '</PLAN>' in content:
+                    plan_start = content.index('<PLAN>') + 6
+                    plan_end = content.index('</PLAN>')
+                    plan_text = content[plan_start:plan_end].strip()
+
+                    if plan_text:
+                        messages.append({
+                            'timestamp': obs.get('created'),
+                            'type': 'assistant_plan',
+                            'text': plan_text
+                        })
+
+                if '<NEXT_STEP>' in content and '</NEXT_STEP>' in content:
+                    step_start = content.index('<NEXT_STEP>') + 11
+                    step_end = content.index('</NEXT_STEP>')
+                    step_text = content[step_start:step_end].strip()
+
+                    if step_text:
+                        messages.append({
+                            'timestamp': obs.get('created'),
+                            'type': 'assistant_action',
+                            'text': step_text
+                        })
+
+        return messages
+
+    def extract_tool_uses(self, task_data: Dict[str, Any]) -> List[str]:
+        """Extract tools used from task data."""
+        tools = set()
+
+        observations = task_data.get('finalAgentState', {}).get('observations', [])
+
+        for obs in observations:
+            assistant_request = obs.get('assistantRequest', {})
+            tool_uses = assistant_request.get('toolUses', [])
+
+            for tool_use in tool_uses:
+                tool_name = tool_use.get('name')
+                if tool_name:
+                    tools.add(tool_name)
+
+        return list(tools)
+
+    def extract_files_from_context(self, task_data: Dict[str, Any]) -> List[str]:
+        """Extract files from editor context."""
+        files = []
+
+        editor_context = task_data.get('finalAgentState', {}).get('issue', {}).get('editorContext', {})
+
+        # Get open files
+        open_files = editor_context.get('openFiles', [])
+        files.extend(open_files[:5])  # Limit to first 5
+
+        return files
+
+    def is_trivial_activity(self, description: str) -> bool:
+        """Determine if an activity is trivial based on content."""
+        trivial_patterns = [
+            'formatting',
+            'typo',
+            'whitespace',
+            'indentation',
+            'rename variable',
+            'console.log',
+            '.gitignore',
+            'configuration',
+            'settings.json'
+        ]
+
+        description_lower = description.lower()
+        return any(pattern in description_lower for pattern in trivial_patterns)
+
+    def parse_chains_in_directory(self, matterhorn_dir: Path, since: datetime) -> List[Dict[str, Any]]:
+        """Parse all chains (conversation threads) in a matterhorn directory."""
+        activities = []
+        issues_dir = matterhorn_dir / "issues"
+
+        if not issues_dir.exists():
+            return activities
+
+        # Iterate through all chain JSON files
+        for chain_file in issues_dir.glob("chain-*.json"):
+            chain_metadata = self.parse_chain_metadata(chain_file)
+
+            if not chain_metadata:
+                continue
+
+            # Check timestamp
+            created_str = chain_metadata.get('created')
+            if not created_str:
+                continue
+
+            try:
+                created_time = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
+                if created_time < since:
+                    continue
+            except (ValueError, AttributeError):
+                continue
+
+            chain_name = chain_metadata.get('name', 'Unnamed task')
+            chain_id = chain_metadata['id']['id']
+
+            # Skip trivial activities
+            if self.is_trivial_activity(chain_name):
+                continue
+
+            # Parse task files in this chain
+            chain_dir = issues_dir / f"chain-{chain_id}"
+
+            if not chain_dir.exists():
+                continue
+
+            for task_file in chain_dir.glob("task-*.json"):
+                task_data = self.parse_task_file(task_file)
+
+                if not task_data:
+                    continue
+
+                # Extract messages and tools
+                messages = self.extract_user_messages(task_data)
+                tools = self.extract_tool_uses(task_data)
+                files = self.extract_files_from_context(task_data)
+
+                # Combine relevant messages into summary
+                summary_parts = [chain_name]
+
+                # Add key user messages
+                user_msgs = [m['text'] for m in messages if m['type'] == 'user_request' or m['type'] == 'user_response']
+                if user_msgs:
+                    summary_parts.append(user_msgs[0][:100])  # First user message
+
+                activities.append({
+                    'timestamp': created_str,
+                    'request': ' - '.join(summary_parts),
+                    'tools': tools,
+                    'files': files,
+                    'chain_name': chain_name,
+                    'state': chain_metadata.get('state', 'Unknown')
+                })
+
+        return activities
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Daily rollups of parsed activities.
+
+A rollup row summarizes one (day, project, source): activity count, tool
+histogram, distinct files, first/last timestamps and top requests. Rows for
+closed days are stored in the activity store, so weekly and monthly reports
+combine a few dozen rows and only parse raw sessions for days that are
+still open (usually just today).
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from activity_store import activity_files
+from parsing_engine import parse_timestamp
+
+MAX_ROLLUP_FILES = 500
+MAX_TOP_REQUESTS = 5
+
+RollupKey = Tuple[str, str, str]
+
+
+def local_day(timestamp: datetime) -> str:
+    """ISO date of a timestamp in local time (reports follow the user's day)."""
+    return timestamp.astimezone().date().isoformat()
+
+
+def by_count(counts: Counter, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Counter items by count, ties by name, so cold and rollup-served reports agree."""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def request_weight(activity: Dict[str, Any]) -> int:
+    """Rank requests by how much work they caused."""
+    return len(activity.get('tools') or []) + 2 * len(activity.get('files') or [])
+
+
+def empty_rollup(day: str, project: str, source: str) -> Dict[str, Any]:
+    return {
+        'day': day,
+        'project': project,
+        'source': source,
+        'activities': 0,
+        'tools': {},
+        'files': [],
+        'first': None,
+        'last': None,
+        'top_requests': [],
+    }
+
+
+def rollup_activities(summary: Dict[str, List[Dict[str, Any]]]) -> Dict[RollupKey, Dict[str, Any]]:
+    """Build per-day, per-project, per-source rollups from a merged summary."""
+    grouped: Dict[RollupKey, List[Tuple[datetime, Dict[str, Any]]]] = defaultdict(list)
+    for project, activities in summary.items():
+        for activity in activities:
+            timestamp = parse_timestamp(activity.get('timestamp'))
+            if timestamp is None:
+                continue
+            key = (local_day(timestamp), project, activity.get('source', 'unknown'))
+            grouped[key].append((timestamp, activity))
+
+    rollups = {}
+    for (day, project, source), items in grouped.items():
+        rollup = empty_rollup(day, project, source)
+        tools: Counter = Counter()
+        files: List[str] = []
+        seen_files = set()
+        for _, activity in items:
+            tools.update(t for t in activity.get('tools') or [] if t)
+            for path in activity_files(activity):
+                if path not in seen_files and len(files) < MAX_ROLLUP_FILES:
+                    seen_files.add(path)
+                    files.append(path)
+
+        times = [t for t, _ in items]
+        ranked = sorted(items, key=lambda item: (-request_weight(item[1]), item[0]))
+        top = []
+        seen_requests = set()
+        for _, activity in ranked:
+            text = activity.get('request', '').strip()[:150]
+            if text and text.lower() not in seen_requests:
+                seen_requests.add(text.lower())
+                top.append({'request': text, 'weight': request_weight(activity)})
+            if len(top) >= MAX_TOP_REQUESTS:
+                break
+
+        rollup.update({
+            'activities': len(items),
+            'tools': dict(tools),
+            'files': files,
+            'first': min(times).isoformat(),
+            'last': max(times).isoformat(),
+            'top_requests': top,
+        })
+        rollups[(day, project, source)] = rollup
+    return rollups
+
+
+def combine_rollups(rollups: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine rollup rows into one report entry per project."""
+    report: Dict[str, Dict[str, Any]] = {}
+    for rollup in rollups:
+        entry = report.setdefault(rollup['project'], {
+            'activities': 0,
+            'by_source': Counter(),
+            'days': set(),
+            'tools': Counter(),
+            'files': set(),
+            'first': None,
+            'last': None,
+            'top_requests': [],
+        })
+        entry['activities'] += rollup['activities']
+        entry['by_source'][rollup['source']] += rollup['activities']
+        entry['days'].add(rollup['day'])
+        entry['tools'].update(rollup['tools'])
+        entry['files'].update(rollup['files'])
+        if rollup['first'] and (entry['first'] is None or rollup['first'] < entry['first']):
+            entry['first'] = rollup['first']
+        if rollup['last'] and (entry['last'] is None or rollup['last'] > entry['last']):
+            entry['last'] = rollup['last']
+        entry['top_requests'].extend(rollup['top_requests'])
+
+    for entry in report.values():
+        seen = set()
+        top = []
+        for item in sorted(entry['top_requests'], key=lambda r: (-r['weight'], r['request'])):
+            if item['request'].lower() not in seen:
+                seen.add(item['request'].lower())
+                top.append(item['request'])
+        entry['top_requests'] = top[:MAX_TOP_REQUESTS]
+    return report
+
+
+def format_report(report: Dict[str, Dict[str, Any]], first_day: date, last_day: date) -> str:
+    """Format a combined rollup report."""
+    days = (last_day - first_day).days + 1
+    lines = [f"=== Report: {first_day.isoformat()} to {last_day.isoformat()} ({days} days) ==="]
+
+    ordered = sorted(report.items(), key=lambda item: (-item[1]['activities'], item[0]))
+    for project, entry in ordered:
+        by_source = ', '.join(f"{source} {count}" for source, count in by_count(entry['by_source']))
+        first = datetime.fromisoformat(entry['first']).astimezone()
+        last = datetime.fromisoformat(entry['last']).astimezone()
+
+        lines.append(f"\n=== {project} ===\n")
+        lines.append(f"Activities: {entry['activities']} ({by_source})")
+        lines.append(f"Active days: {len(entry['days'])}")
+        lines.append(f"First/last: {first.strftime('%Y-%m-%d %H:%M')} -> {last.strftime('%Y-%m-%d %H:%M')}")
+        if entry['tools']:
+            tools = ', '.join(f"{tool} ({count})" for tool, count in by_count(entry['tools'], 8))
+            lines.append(f"Tools: {tools}")
+        lines.append(f"Files touched: {len(entry['files'])}")
+        if entry['top_requests']:
+            lines.append("Top requests:")
+            for request in entry['top_requests']:
+                lines.append(f"- {request[:100]}")
+
+    return '\n'.join(lines)
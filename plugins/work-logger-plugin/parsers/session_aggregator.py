@@ -4,27 +4,75 @@ Unified session aggregator that combines Claude Code and Codex sessions
 to generate comprehensive work summaries.
 """
 
+import math
 import sys
-from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
+from pathlib import Path
 
-# Add parsers to path
-sys.path.insert(0, str(Path(__file__).parent))
-
-from claude_projects_parser import ClaudeProjectsParser
-from codex_sessions_parser import CodexSessionsParser
-from junie_sessions_parser import JunieSessionsParser
+from deadline import Deadline, describe_incomplete
+from source_registry import SourceSpec, configured_roots, resolve_sources
 
 
 class SessionAggregator:
     """Aggregate work activities from multiple AI assistant session sources."""
 
-    def __init__(self):
-        self.claude_parser = ClaudeProjectsParser()
-        self.codex_parser = CodexSessionsParser()
-        self.junie_parser = JunieSessionsParser()
+    def __init__(
+        self,
+        sources: Optional[List[str]] = None,
+        max_record_bytes: Optional[int] = None,
+        use_journal: bool = True,
+        extra_roots: Optional[Dict[str, List[str]]] = None
+    ):
+        # Parsers are imported and constructed lazily, only for sources in use
+        self.sources: List[SourceSpec] = resolve_sources(sources)
+        self.max_record_bytes = max_record_bytes
+        self.use_journal = use_journal
+        # Roots from roots.json plus any given here (e.g. --root), per source
+        self.extra_roots: Dict[str, List[str]] = configured_roots()
+        for name, roots in (extra_roots or {}).items():
+            resolve_sources([name])
+            self.extra_roots.setdefault(name, []).extend(roots)
+        self._parsers: Dict[str, Any] = {}
+
+    def source_roots(self, spec: SourceSpec) -> Optional[List[str]]:
+        """Default roots plus the extra roots of a source, or None when it has no extra roots."""
+        extra = self.extra_roots.get(spec.name)
+        if not extra:
+            return None
+        roots: List[str] = []
+        seen = set()
+        for root in spec.default_roots + extra:
+            key = str(Path(root).expanduser().resolve())
+            if key not in seen:
+                seen.add(key)
+                roots.append(root)
+        return roots
+
+    def get_parser(self, name: str) -> Any:
+        """Return the parser for a source, importing it on first use."""
+        if name not in self._parsers:
+            spec = next((s for s in self.sources if s.name == name), None)
+            if spec is None:
+                spec = resolve_sources([name])[0]
+            parser = spec.create_parser(self.source_roots(spec))
+            if self.max_record_bytes is not None:
+                parser.max_record_bytes = self.max_record_bytes
+            self._parsers[name] = parser
+        return self._parsers[name]
+
+    @property
+    def claude_parser(self) -> Any:
+        return self.get_parser('claude')
+
+    @property
+    def codex_parser(self) -> Any:
+        return self.get_parser('codex')
+
+    @property
+    def junie_parser(self) -> Any:
+        return self.get_parser('junie')
 
     def merge_activities(
         self,
@@ -32,26 +80,21 @@ class SessionAggregator:
         codex_summary: Dict[str, List[Dict[str, Any]]],
         junie_summary: Dict[str, List[Dict[str, Any]]]
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Merge activities from all sources, removing duplicates."""
-        merged = defaultdict(list)
-
-        # Add Claude activities
-        for project, activities in claude_summary.items():
-            for activity in activities:
-                activity['source'] = 'claude'
-                merged[project].append(activity)
+        """Merge activities from all sources (kept for callers of the three-source API)."""
+        return self.merge_source_summaries({'claude': claude_summary, 'codex': codex_summary, 'junie': junie_summary})
 
-        # Add Codex activities
-        for project, activities in codex_summary.items():
-            for activity in activities:
-                activity['source'] = 'codex'
-                merged[project].append(activity)
+    def merge_source_summaries(
+        self,
+        source_summaries: Dict[str, Dict[str, List[Dict[str, Any]]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Merge per-source summaries (keyed by source name), tagging each activity with its source."""
+        merged = defaultdict(list)
 
-        # Add Junie activities
-        for project, activities in junie_summary.items():
-            for activity in activities:
-                activity['source'] = 'junie'
-                merged[project].append(activity)
+        for source, summary in source_summaries.items():
+            for project, activities in summary.items():
+                for activity in activities:
+                    activity['source'] = source
+                    merged[project].append(activity)
 
         # Sort activities by timestamp within each project
         for project in merged:
@@ -61,21 +104,185 @@ class SessionAggregator:
 
         return dict(merged)
 
-    def get_work_summary(self, since_hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
-        """Get comprehensive work summary from all sources."""
+    def get_work_summary(
+        self,
+        since_hours: int = 24,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get comprehensive work summary from all available sources.
+
+        With a deadline, each source gets an even share of the time left
+        when it starts; sources and files that did not finish are recorded
+        in deadline.incomplete and the best results so far are returned.
+        """
         print(f"Fetching work activities from the last {since_hours} hours...\n", file=sys.stderr)
 
-        # Get summaries from all sources
-        claude_summary = self.claude_parser.get_work_summary(since_hours)
-        codex_summary = self.codex_parser.get_work_summary(since_hours)
-        junie_summary = self.junie_parser.get_work_summary(since_hours)
+        available = []
+        for spec in self.sources:
+            # Probe before importing so missing sources cost a single stat()
+            if spec.is_available(self.source_roots(spec)):
+                available.append(spec)
+            else:
+                print(f"{spec.label} sessions: not found, skipped", file=sys.stderr)
+
+        source_summaries = {}
+        for position, spec in enumerate(available):
+            if deadline is not None and deadline.expired():
+                deadline.mark_incomplete(spec.name, None, 'skipped')
+                print(f"{spec.label} sessions: out of time, skipped", file=sys.stderr)
+                continue
+
+            journal_summary = self.get_journal_summary(spec.name, since_hours)
+            if journal_summary is not None:
+                source_summaries[spec.name] = journal_summary
+                count = sum(len(v) for v in journal_summary.values())
+                print(f"{spec.label} sessions: {count} activities (from hook journal)", file=sys.stderr)
+                continue
+
+            share = deadline.share(1 / (len(available) - position)) if deadline is not None else None
+            summary = self.get_parser(spec.name).get_work_summary(since_hours, deadline=share)
+            source_summaries[spec.name] = summary
+            print(f"{spec.label} sessions: {sum(len(v) for v in summary.values())} activities", file=sys.stderr)
 
-        print(f"Claude Code sessions: {sum(len(v) for v in claude_summary.values())} activities", file=sys.stderr)
-        print(f"Codex sessions: {sum(len(v) for v in codex_summary.values())} activities", file=sys.stderr)
-        print(f"Junie sessions: {sum(len(v) for v in junie_summary.values())} activities\n", file=sys.stderr)
+        if deadline is not None and deadline.is_partial:
+            print(f"Partial results, incomplete: {describe_incomplete(deadline.incomplete)}", file=sys.stderr)
+        print(file=sys.stderr)
 
         # Merge and return
-        return self.merge_activities(claude_summary, codex_summary, junie_summary)
+        return self.merge_source_summaries(source_summaries)
+
+    def get_journal_summary(self, source: str, since_hours: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Claude activities from the hook journal, or None when it does not cover the window."""
+        if source != 'claude' or not self.use_journal:
+            return None
+        # The hooks only see this machine's sessions, not those under extra roots
+        if self.extra_roots.get(source):
+            return None
+        from hook_journal import HookJournal
+
+        journal = HookJournal()
+        since = datetime.now().astimezone() - timedelta(hours=since_hours)
+        if not journal.covers(since):
+            return None
+        parser = self.get_parser(source)
+        summary = journal.get_work_summary(since_hours, parser)
+
+        # Sessions the hooks never saw (disabled, or not enabled in that project) come from transcripts
+        missing = journal.uncovered(since, parser.discover(since))
+        if missing:
+            print(f"{source}: {len(missing)} sessions missing from the hook journal, read from transcripts", file=sys.stderr)
+            for project, activities in parser.create_engine().run(since, units=missing).items():
+                summary.setdefault(project, []).extend(activities)
+        return summary
+
+    def load_full_request(self, activity: Dict[str, Any]) -> str:
+        """Full request text of an activity, re-read from disk only if it was truncated."""
+        locator = activity.get('request_locator')
+        if not locator:
+            return activity['request']
+        body = self.get_parser(activity['source']).load_request_body(locator)
+        return body if body is not None else activity['request']
+
+    def update_index(self, summary: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Add parsed activities to the persistent activity store and file index."""
+        import sqlite3
+        from activity_store import ActivityStore
+
+        try:
+            with ActivityStore() as store:
+                added = store.add_activities(summary)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not update activity index: {e}", file=sys.stderr)
+            return
+        if added:
+            print(f"Indexed {added} new activities", file=sys.stderr)
+
+    def export_bundle(
+        self,
+        path: str,
+        since_hours: int = 24 * 30,
+        user: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Parse the window and write it as a per-user bundle for team merges."""
+        import getpass
+        from bundles import write_bundle
+
+        summary = self.get_work_summary(since_hours=since_hours, deadline=deadline)
+        return write_bundle(Path(path), summary, user or getpass.getuser())
+
+    def get_rollup_report(
+        self,
+        since_hours: int = 168,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], date, date]:
+        """Build a per-project report from daily rollups plus a parse of the open days.
+
+        Closed days come from stored rollups; raw sessions are only parsed
+        from the earliest day that is not yet closed (normally today).
+        Reports have day granularity: the first day always counts in full.
+        A parse cut short by the deadline closes no days.
+        """
+        from activity_store import ActivityStore
+        from rollups import combine_rollups, rollup_activities
+
+        now = datetime.now().astimezone()
+        start = now - timedelta(hours=since_hours)
+        first_day, today = start.date(), now.date()
+        days = [(first_day + timedelta(days=i)).isoformat() for i in range((today - first_day).days + 1)]
+
+        def midnight(day: str) -> datetime:
+            return datetime.combine(date.fromisoformat(day), time.min).astimezone()
+
+        with ActivityStore() as store:
+            # Missing sources are never closed, or they would force a full re-parse every run
+            sources = [spec.name for spec in self.sources if spec.is_available(self.source_roots(spec))]
+            closed = store.closed_days(days, sources)
+            open_days = [day for day in days if any(day not in closed[source] for source in sources)]
+
+            rows = []
+            if open_days:
+                # Parse open days from midnight so each of them can be closed in full
+                parse_since = midnight(min(open_days))
+                hours = max(1, math.ceil((now - parse_since).total_seconds() / 3600))
+                summary = self.get_work_summary(since_hours=hours, deadline=deadline)
+                fresh = rollup_activities(summary)
+
+                # Past days that the parse covered from midnight are now closed
+                closable = [day for day in open_days if day < today.isoformat() and midnight(day) >= parse_since]
+                if deadline is not None and deadline.is_partial:
+                    closable = []
+                store.close_days(
+                    [r for r in fresh.values() if r['day'] in closable],
+                    closable,
+                    sources
+                )
+                for source in sources:
+                    closed[source].update(closable)
+
+                # The parse window is rounded up to whole hours, so it can reach into the day before
+                report_days = set(days)
+                rows.extend(
+                    r for r in fresh.values()
+                    if r['day'] in report_days and r['source'] in closed and r['day'] not in closed[r['source']]
+                )
+
+            rows.extend(
+                r for r in store.load_rollups(days[0], days[-1], sources)
+                if r['day'] in closed.get(r['source'], ())
+            )
+
+        return combine_rollups(rows), first_day, today
+
+    def get_active_time(
+        self,
+        summary: Dict[str, List[Dict[str, Any]]],
+        idle_gap_minutes: float = 30
+    ) -> Dict[str, Dict[str, float]]:
+        """Estimate per-project active minutes per day ({day: {project: minutes}})."""
+        from sessionizer import estimate_active_time
+
+        return estimate_active_time(summary, idle_gap_minutes=idle_gap_minutes)
 
     def format_for_logging(self, summary: Dict[str, List[Dict[str, Any]]]) -> str:
         """Format summary in a log-friendly format."""
@@ -114,6 +321,8 @@ class SessionAggregator:
 
     def get_activity_summary_bullets(self, summary: Dict[str, List[Dict[str, Any]]]) -> List[str]:
         """Generate bullet-point summary of key activities."""
+        from digest import SUBSTANTIAL_KEYWORDS
+
         bullets = []
         seen_requests = set()
 
@@ -141,16 +350,8 @@ class SessionAggregator:
             seen_requests.add(request_key)
 
             # Look for substantial work indicators
-            substantial_keywords = [
-                'pr', 'pull request', 'merge', 'deploy',
-                'implement', 'fix', 'bug', 'feature',
-                'api', 'endpoint', 'migration', 'refactor',
-                'optimize', 'performance', 'review',
-                'sync', 'meeting', 'discuss'
-            ]
-
             request_lower = request.lower()
-            if any(keyword in request_lower for keyword in substantial_keywords):
+            if any(keyword in request_lower for keyword in SUBSTANTIAL_KEYWORDS):
                 # Extract relevant portion
                 summary_text = request[:150]
                 if len(request) > 150:
@@ -165,6 +366,94 @@ class SessionAggregator:
         return bullets
 
 
+def print_touched(path: str) -> None:
+    """Print every indexed request that touched a path, newest first."""
+    from activity_store import ActivityStore
+
+    with ActivityStore() as store:
+        results = store.touched(path)
+
+    if not results:
+        print(f"No indexed activities touched {path}.")
+        return
+
+    for result in results:
+        timestamp = datetime.fromisoformat(result['timestamp'].replace('Z', '+00:00'))
+        print(f"[{timestamp.strftime('%Y-%m-%d %H:%M')}] [{result['source'].upper()}] {result['project']}")
+        print(f"Request: {result['request'][:100]}")
+        if result['files']:
+            print(f"Files: {', '.join(result['files'][:5])}")
+        print("---")
+
+
+def parse_day(value: str) -> float:
+    """Parse a YYYY-MM-DD (local time) command-line date into an epoch."""
+    return datetime.strptime(value, '%Y-%m-%d').timestamp()
+
+
+def print_search(args: Any) -> None:
+    """Run a full-text search over indexed activities and print ranked results."""
+    import time
+    from activity_store import ActivityStore
+
+    since_epoch = parse_day(args.since) if args.since else None
+    if args.days:
+        since_epoch = max(since_epoch or 0, time.time() - args.days * 86400)
+    until_epoch = parse_day(args.until) + 86400 if args.until else None
+
+    with ActivityStore() as store:
+        results = store.search(
+            ' '.join(args.query),
+            project=args.project,
+            source=args.source,
+            since_epoch=since_epoch,
+            until_epoch=until_epoch,
+            limit=args.limit
+        )
+
+    if not results:
+        print("No matching activities found.")
+        return
+
+    for result in results:
+        timestamp = datetime.fromisoformat(result['timestamp'].replace('Z', '+00:00'))
+        print(f"[{timestamp.strftime('%Y-%m-%d %H:%M')}] [{result['source'].upper()}] {result['project']}")
+        print(f"Match: {result['snippet']}")
+        print("---")
+
+
+def print_team(args: Any) -> None:
+    """Merge exported bundles into a team report or timeline."""
+    from bundles import BundleReader, format_team_log, format_team_report, merge_bundles, team_report
+
+    try:
+        readers = [BundleReader(Path(path)) for path in args.bundles]
+    except OSError as e:
+        raise ValueError(f"Cannot read bundle: {e}")
+    first_day = args.since
+    if args.days:
+        first_day = max(first_day or '', (date.today() - timedelta(days=args.days - 1)).isoformat())
+    activities = merge_bundles(readers, first_day, args.until, args.project)
+
+    if args.format == 'log':
+        output = format_team_log(activities, args.limit)
+    else:
+        report = team_report(activities)
+        output = format_team_report(report, sorted({reader.user for reader in readers})) if report else ''
+    print(output or "No team activities found.")
+
+
+def cancel_on_interrupt(deadline: Deadline) -> None:
+    """Make the first Ctrl-C cancel the run (keeping partial results); a second one exits."""
+    import signal
+
+    def handle(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        deadline.cancel()
+
+    signal.signal(signal.SIGINT, handle)
+
+
 def main():
     """Test the aggregator."""
     import argparse
@@ -178,28 +467,242 @@ def main():
     )
     parser.add_argument(
         '--format',
-        choices=['log', 'bullets'],
+        choices=['log', 'bullets', 'json', 'report', 'digest', 'stats'],
         default='log',
-        help='Output format (default: log)'
+        help='Output format (default: log); report summarizes multi-day windows from daily rollups, '
+             'digest ranks and compresses activities into --budget-tokens, '
+             'stats prints hourly, weekday, project and tool breakdowns'
     )
+    parser.add_argument(
+        '--budget-tokens',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Approximate token budget for --format digest (default: 1500)'
+    )
+    parser.add_argument(
+        '--sources',
+        default=None,
+        help='Comma-separated sources to include, e.g. claude,codex (default: all)'
+    )
+    parser.add_argument(
+        '--idle-gap',
+        type=float,
+        default=30,
+        metavar='MINUTES',
+        help='Idle gap that ends a work block when estimating active time (default: 30)'
+    )
+    parser.add_argument(
+        '--max-record-mb',
+        type=float,
+        default=None,
+        metavar='MB',
+        help='Skip session records larger than this without decoding them; must be positive (default: 8)'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='Return the best results available after this many seconds, marking what is incomplete'
+    )
+    parser.add_argument(
+        '--no-journal',
+        action='store_true',
+        help='Parse Claude transcripts even when the hook journal covers the window'
+    )
+    parser.add_argument(
+        '--root',
+        action='append',
+        default=[],
+        metavar='SOURCE=PATH',
+        help='Also scan this session root for a source, e.g. claude=/mnt/vm/home/me/.claude/projects '
+             '(repeatable; adds to roots.json in the work logger home). '
+             'Sessions found under several roots are parsed once'
+    )
+    parser.add_argument(
+        '--touched',
+        metavar='PATH',
+        help='List indexed requests that changed a file or anything under a directory'
+    )
+    parser.add_argument(
+        '--no-index',
+        action='store_true',
+        help='Do not add parsed activities to the persistent activity index'
+    )
+
+    subparsers = parser.add_subparsers(dest='command')
+    search_parser = subparsers.add_parser(
+        'search',
+        help='Full-text search over indexed activities',
+        description='Search indexed activities. Supports "exact phrases", prefix* and AND/OR/NOT.'
+    )
+    search_parser.add_argument('query', nargs='+', help='Search query')
+    search_parser.add_argument('--project', help='Only projects whose name contains this text')
+    search_parser.add_argument('--source', choices=['claude', 'codex', 'junie'], help='Only this source')
+    search_parser.add_argument('--since', metavar='YYYY-MM-DD', help='Only activities on or after this day')
+    search_parser.add_argument('--until', metavar='YYYY-MM-DD', help='Only activities on or before this day')
+    search_parser.add_argument('--days', type=int, help='Only activities from the last N days')
+    search_parser.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+
+    export_parser = subparsers.add_parser(
+        'export',
+        help='Write a compact per-user activity bundle for team merges',
+        description='Parse the last N days and write them as a compressed, per-day bundle.'
+    )
+    export_parser.add_argument('--days', type=int, default=30, help='Days to export (default: 30)')
+    export_parser.add_argument('--user', help='Name recorded in the bundle (default: login name)')
+    export_parser.add_argument('--output', '-o', help='Bundle path (default: <user>.wlb)')
+
+    team_parser = subparsers.add_parser(
+        'team',
+        help='Merge several people\'s bundles into a team report',
+        description='K-way merge exported bundles by time; only the selected days are decoded.'
+    )
+    team_parser.add_argument('bundles', nargs='+', help='Bundle files (.wlb)')
+    team_parser.add_argument('--since', metavar='YYYY-MM-DD', help='First day to include')
+    team_parser.add_argument('--until', metavar='YYYY-MM-DD', help='Last day to include')
+    team_parser.add_argument('--days', type=int, help='Only the last N days')
+    team_parser.add_argument('--project', help='Only projects whose name contains this text')
+    team_parser.add_argument(
+        '--format',
+        choices=['report', 'log'],
+        default='report',
+        help='Per-project report or chronological timeline (default: report)'
+    )
+    team_parser.add_argument('--limit', type=int, help='With --format log, only the last N activities')
 
     args = parser.parse_args()
 
-    aggregator = SessionAggregator()
-    summary = aggregator.get_work_summary(since_hours=args.hours)
+    if args.command == 'team':
+        try:
+            print_team(args)
+        except ValueError as e:
+            team_parser.error(str(e))
+        return
+
+    if args.command == 'search':
+        try:
+            print_search(args)
+        except (ValueError, RuntimeError) as e:
+            # RuntimeError: this SQLite build has no FTS5
+            search_parser.error(str(e))
+        return
+
+    if args.touched:
+        print_touched(args.touched)
+        return
+
+    if args.budget_tokens is not None and args.budget_tokens <= 0:
+        parser.error('--budget-tokens must be positive')
+    if args.max_record_mb is not None and args.max_record_mb <= 0:
+        parser.error('--max-record-mb must be positive')
+
+    extra_roots: Dict[str, List[str]] = defaultdict(list)
+    for value in args.root:
+        name, sep, path = value.partition('=')
+        if not sep or not name.strip() or not path.strip():
+            parser.error(f"--root expects SOURCE=PATH, got {value!r}")
+        extra_roots[name.strip()].append(path.strip())
+
+    sources = [s.strip() for s in args.sources.split(',') if s.strip()] if args.sources else None
+    try:
+        max_record_bytes = max(1, int(args.max_record_mb * (1 << 20))) if args.max_record_mb else None
+        aggregator = SessionAggregator(
+            sources=sources,
+            max_record_bytes=max_record_bytes,
+            use_journal=not args.no_journal,
+            extra_roots=extra_roots
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    deadline = None
+    if args.deadline is not None:
+        deadline = Deadline(args.deadline)
+        cancel_on_interrupt(deadline)
+
+    if args.command == 'export':
+        import getpass
+        from bundles import BUNDLE_SUFFIX
+
+        user = args.user or getpass.getuser()
+        output = args.output or f"{user}{BUNDLE_SUFFIX}"
+        header = aggregator.export_bundle(output, since_hours=args.days * 24, user=user, deadline=deadline)
+        print(f"Wrote {header['activities']} activities over {len(header['days'])} days to {output}")
+        if deadline is not None and deadline.is_partial:
+            print(f"(Partial: {describe_incomplete(deadline.incomplete)})")
+        return
+
+    if args.format == 'report':
+        from rollups import format_report
+
+        report, first_day, last_day = aggregator.get_rollup_report(since_hours=args.hours, deadline=deadline)
+        if not report:
+            print("No work activities found.")
+            return
+        print(format_report(report, first_day, last_day))
+        if deadline is not None and deadline.is_partial:
+            print(f"\n(Partial: {describe_incomplete(deadline.incomplete)})")
+        return
+
+    summary = aggregator.get_work_summary(since_hours=args.hours, deadline=deadline)
+    incomplete = deadline.incomplete if deadline is not None else []
 
-    if not summary:
+    if not summary and args.format != 'json':
         print("No work activities found.")
+        if incomplete:
+            print(f"(Partial: {describe_incomplete(incomplete)})")
         return
 
-    if args.format == 'bullets':
+    if summary and not args.no_index:
+        aggregator.update_index(summary)
+
+    if args.format == 'stats':
+        from activity_stats import ActivityColumns, compute_stats, format_stats
+
+        print(format_stats(compute_stats(ActivityColumns.from_summary(summary))))
+        if incomplete:
+            print(f"\n(Partial: {describe_incomplete(incomplete)})")
+        return
+
+    if args.format == 'digest':
+        from digest import DEFAULT_BUDGET_TOKENS, build_digest
+
+        print(build_digest(summary, budget_tokens=args.budget_tokens or DEFAULT_BUDGET_TOKENS, since_hours=args.hours))
+        if incomplete:
+            print(f"(Partial: {describe_incomplete(incomplete)})")
+        return
+
+    from sessionizer import format_active_time, format_minutes, project_totals
+
+    active_time = aggregator.get_active_time(summary, idle_gap_minutes=args.idle_gap)
+
+    if args.format == 'json':
+        import json
+
+        print(json.dumps({
+            'since_hours': args.hours,
+            'activities': summary,
+            'active_minutes': active_time,
+            'active_minutes_total': project_totals(active_time),
+            'incomplete': incomplete,
+        }, indent=2, default=str))
+    elif args.format == 'bullets':
         bullets = aggregator.get_activity_summary_bullets(summary)
         print("\n=== Key Activities ===\n")
         for bullet in bullets:
             print(f"• {bullet}")
+        print("\n=== Active Time ===\n")
+        for project, minutes in project_totals(active_time).items():
+            print(f"• {project}: {format_minutes(minutes)}")
     else:
         output = aggregator.format_for_logging(summary)
         print(output)
+        print(format_active_time(active_time))
+
+    if incomplete and args.format != 'json':
+        print(f"\n(Partial: {describe_incomplete(incomplete)})")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Reader layer for plain and compressed session files.
+
+Rotated sessions (`.jsonl.gz`, `.jsonl.bz2`, `.jsonl.xz`, `.jsonl.zst`) are
+stream-decompressed line by line; gzip/bz2/lzma come from the standard
+library and zstd is used when the `zstandard` package is installed.
+The time span of each archive is cached so archives that end before the
+requested window are never opened again.
+"""
+
+import importlib.util
+import io
+import json
+import lzma
+import mmap
+import os
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storage_paths import data_path
+
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.lzma', '.zst')
+
+# Lines longer than this are skipped after peeking at their first PEEK_BYTES
+# (or first max_bytes, if smaller, so a skipped line's data is always shorter than the line)
+MAX_RECORD_BYTES = 8 << 20
+PEEK_BYTES = 4096
+READ_CHUNK_BYTES = 1 << 20
+
+# What a truncated or corrupt archive raises part-way through a read
+READ_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError)
+
+# Decompressed bytes compared to tell copies of one session apart from different sessions
+FINGERPRINT_BYTES = 1 << 16
+
+
+def compression_of(path: Path) -> Optional[str]:
+    """Compression suffix of a session file, or None for plain files."""
+    suffix = path.suffix.lower()
+    return suffix if suffix in COMPRESSED_SUFFIXES else None
+
+
+def is_compressed(path: Path) -> bool:
+    return compression_of(path) is not None
+
+
+def missing_codec(path: Path) -> Optional[str]:
+    """Package a session file needs for decompression that is not installed, or None."""
+    if compression_of(path) == '.zst' and importlib.util.find_spec('zstandard') is None:
+        return 'zstandard'
+    return None
+
+
+def session_stem(path: Path) -> str:
+    """File name without its compression suffix ('a.jsonl.gz' -> 'a.jsonl')."""
+    return path.stem if is_compressed(path) else path.name
+
+
+def is_session_file(path: Path, extension: str) -> bool:
+    """True for '<name><extension>' optionally followed by a compression suffix."""
+    return session_stem(path).endswith(extension)
+
+
+def select_session_files(paths: Iterable[Path], extension: str) -> List[Path]:
+    """Session files with the given extension, preferring a plain file over its archive."""
+    chosen: Dict[str, Path] = {}
+    for path in paths:
+        if not is_session_file(path, extension):
+            continue
+        stem = session_stem(path)
+        # A plain copy is the live one; an archive of it is a rotation in progress
+        if stem not in chosen or (is_compressed(chosen[stem]) and not is_compressed(path)):
+            chosen[stem] = path
+    return list(chosen.values())
+
+
+def open_session_file(path: Path) -> BinaryIO:
+    """Open a session file for binary line iteration, decompressing as needed."""
+    compression = compression_of(path)
+    if compression is None:
+        return open(path, 'rb')
+    if compression == '.gz':
+        import gzip
+        return gzip.open(path, 'rb')
+    if compression == '.bz2':
+        import bz2
+        return bz2.open(path, 'rb')
+    if compression in ('.xz', '.lzma'):
+        return lzma.open(path, 'rb')
+
+    try:
+        import zstandard
+    except ImportError:
+        raise OSError(f"zstandard is not installed, cannot read {path}")
+    raw = open(path, 'rb')
+    reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return io.BufferedReader(reader)
+
+
+def session_fingerprint(path: Path) -> Optional[bytes]:
+    """The first FINGERPRINT_BYTES of a session's (decompressed) content.
+
+    Session files are append-only, so when one copy's fingerprint is a
+    prefix of another's both are the same session, synced at the same or at
+    different points.
+    """
+    try:
+        with open_session_file(path) as f:
+            return f.read(FINGERPRINT_BYTES)
+    except READ_ERRORS:
+        return None
+
+
+def iter_mapped_lines(path: Path, start: int, max_bytes: int) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (offset, length, data) of a plain file from a byte offset through a read-only memory map.
+
+    Lines longer than max_bytes are never copied out of the map; only
+    their first PEEK_BYTES (at most max_bytes) are returned as data.
+    """
+    peek = min(PEEK_BYTES, max_bytes)
+    with open(path, 'rb') as f:
+        if start >= os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            position = start
+            while position < size:
+                end = mapped.find(b'\n', position)
+                end = size if end < 0 else end + 1
+                length = end - position
+                if length > max_bytes:
+                    yield position, length, mapped[position:position + peek]
+                else:
+                    yield position, length, mapped[position:end]
+                position = end
+
+
+def iter_stream_lines(stream: BinaryIO, start: int, max_bytes: int) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (offset, length, data) of a binary stream, reading at most max_bytes per line.
+
+    The rest of an oversized line is consumed in READ_CHUNK_BYTES pieces and
+    dropped, so only its first PEEK_BYTES (at most max_bytes) are returned
+    and memory stays bounded by max_bytes whatever the record size. A line
+    is oversized here exactly when iter_mapped_lines would skip it.
+    """
+    peek = min(PEEK_BYTES, max_bytes)
+    offset = 0
+    while True:
+        line = stream.readline(max_bytes)
+        if not line:
+            return
+        length = len(line)
+        if length == max_bytes and not line.endswith(b'\n'):
+            line = line[:peek]
+            while True:
+                rest = stream.readline(READ_CHUNK_BYTES)
+                length += len(rest)
+                if not rest or rest.endswith(b'\n'):
+                    break
+        if offset >= start:
+            yield offset, length, line
+        offset += length
+
+
+def iter_session_lines(
+    path: Path,
+    start: int = 0,
+    max_bytes: int = MAX_RECORD_BYTES
+) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (offset, length, data) of a session file, starting at a byte offset.
+
+    data is the whole line, or only its leading bytes when the line is
+    longer than max_bytes (len(data) < length). Plain files are mapped and
+    entered directly at the offset; compressed streams cannot seek, so they
+    are decompressed from the start and lines before the offset are dropped.
+    """
+    if start and not is_compressed(path):
+        yield from iter_mapped_lines(path, start, max_bytes)
+        return
+    with open_session_file(path) as f:
+        yield from iter_stream_lines(f, start, max_bytes)
+
+
+class ArchiveBoundsCache:
+    """Cache of (first, last) entry times per archive, keyed by path, size and mtime."""
+
+    def __init__(self, cache_path: Optional[Path] = None):
+        self.cache_path = Path(cache_path) if cache_path else data_path('archive-bounds.json')
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            with open(self.cache_path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[List[float]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime]
+
+    def get(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Cached bounds (epoch 'first'/'last') if the archive is unchanged."""
+        cached = self.entries.get(str(path))
+        if cached and cached.get('signature') == self._signature(path):
+            return cached
+        return None
+
+    def put(self, path: Path, first: Optional[float], last: Optional[float]) -> None:
+        signature = self._signature(path)
+        if signature is None:
+            return
+        self.entries[str(path)] = {'signature': signature, 'first': first, 'last': last}
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache if it changed, dropping archives that no longer exist."""
+        if not self.dirty:
+            return
+        self.entries = {p: e for p, e in self.entries.items() if os.path.exists(p)}
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            return
+        self.dirty = False
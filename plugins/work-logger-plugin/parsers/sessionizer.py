@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Streaming sessionizer that turns activity timestamps into active work time.
+
+Events are consumed once, in time order. Each project keeps only its open
+work block (start, last event); an event more than the idle gap after the
+previous one, or on a new day, closes the block and adds its duration plus
+a small padding to that project's active minutes for the block's day.
+That is O(n) time and O(projects) working memory.
+"""
+
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from parsing_engine import parse_timestamp
+
+DEFAULT_IDLE_GAP_MINUTES = 30
+DEFAULT_PADDING_MINUTES = 5
+
+
+class Sessionizer:
+    """Group a time-ordered event stream into per-project work blocks."""
+
+    def __init__(
+        self,
+        idle_gap_minutes: float = DEFAULT_IDLE_GAP_MINUTES,
+        padding_minutes: float = DEFAULT_PADDING_MINUTES
+    ):
+        self.idle_gap = timedelta(minutes=idle_gap_minutes)
+        self.padding = timedelta(minutes=padding_minutes)
+        # project -> (block start, last event, local day)
+        self.open_blocks: Dict[str, Tuple[datetime, datetime, str]] = {}
+        # day -> project -> minutes
+        self.active_minutes: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.blocks = 0
+
+    def _close(self, project: str) -> None:
+        start, last, day = self.open_blocks.pop(project)
+        minutes = (last - start + self.padding).total_seconds() / 60
+        self.active_minutes[day][project] += minutes
+        self.blocks += 1
+
+    def feed(self, project: str, timestamp: datetime) -> None:
+        """Consume one event; events must arrive in non-decreasing time order."""
+        day = timestamp.astimezone().date().isoformat()
+        block = self.open_blocks.get(project)
+        if block is not None:
+            start, last, block_day = block
+            if day == block_day and timestamp - last <= self.idle_gap:
+                self.open_blocks[project] = (start, max(last, timestamp), block_day)
+                return
+            self._close(project)
+        self.open_blocks[project] = (timestamp, timestamp, day)
+
+    def finish(self) -> Dict[str, Dict[str, float]]:
+        """Close all open blocks and return {day: {project: active minutes}}."""
+        for project in list(self.open_blocks):
+            self._close(project)
+        return {day: dict(projects) for day, projects in sorted(self.active_minutes.items())}
+
+
+def iter_events(summary: Dict[str, List[Dict[str, Any]]]) -> Iterable[Tuple[datetime, str]]:
+    """Yield (timestamp, project) across all projects in time order.
+
+    Each project's list is already sorted by merge_source_summaries, so a k-way
+    heap merge yields the global order without re-sorting everything.
+    """
+    def project_events(project: str, activities: List[Dict[str, Any]]) -> Iterable[Tuple[datetime, str]]:
+        for activity in activities:
+            timestamp = parse_timestamp(activity.get('timestamp'))
+            if timestamp is not None:
+                yield timestamp, project
+
+    return heapq.merge(*(project_events(p, a) for p, a in summary.items()))
+
+
+def estimate_active_time(
+    summary: Dict[str, List[Dict[str, Any]]],
+    idle_gap_minutes: float = DEFAULT_IDLE_GAP_MINUTES,
+    padding_minutes: float = DEFAULT_PADDING_MINUTES
+) -> Dict[str, Dict[str, float]]:
+    """Estimate per-project active minutes per day from a merged summary."""
+    sessionizer = Sessionizer(idle_gap_minutes, padding_minutes)
+    for timestamp, project in iter_events(summary):
+        sessionizer.feed(project, timestamp)
+    return sessionizer.finish()
+
+
+def format_minutes(minutes: float) -> str:
+    """Format minutes as e.g. '2h 05m'."""
+    total = int(round(minutes))
+    hours, mins = divmod(total, 60)
+    return f"{hours}h {mins:02d}m" if hours else f"{mins}m"
+
+
+def project_totals(active_time: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Total active minutes per project across all days, largest first."""
+    totals: Dict[str, float] = defaultdict(float)
+    for projects in active_time.values():
+        for project, minutes in projects.items():
+            totals[project] += minutes
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_active_time(active_time: Dict[str, Dict[str, float]], per_day: Optional[bool] = None) -> str:
+    """Format active time, per day when the window spans more than one day."""
+    if per_day is None:
+        per_day = len(active_time) > 1
+
+    lines = ["\n=== Active Time ===\n"]
+    if per_day:
+        for day, projects in active_time.items():
+            lines.append(f"{day}:")
+            for project, minutes in sorted(projects.items(), key=lambda item: item[1], reverse=True):
+                lines.append(f"  {project}: {format_minutes(minutes)}")
+        lines.append("Total:")
+    indent = "  " if per_day else ""
+    for project, minutes in project_totals(active_time).items():
+        lines.append(f"{indent}{project}: {format_minutes(minutes)}")
+    return '\n'.join(lines)
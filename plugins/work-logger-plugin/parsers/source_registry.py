@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Registry of AI assistant session sources.
+
+Each source declares the module and class of its parser plus a cheap
+availability probe, so the aggregator only imports and constructs the
+parsers that are both requested and present on this machine.
+"""
+
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from storage_paths import work_logger_home
+
+PARSERS_DIR = str(Path(__file__).parent)
+ROOTS_FILE = 'roots.json'
+
+# Parser modules are imported by their flat names, from wherever the registry was imported
+if PARSERS_DIR not in sys.path:
+    sys.path.insert(0, PARSERS_DIR)
+
+
+class SourceSpec:
+    """Describe one session source without importing its parser."""
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        module: str,
+        class_name: str,
+        default_root: Union[str, List[str]]
+    ):
+        self.name = name
+        self.label = label
+        self.module = module
+        self.class_name = class_name
+        # Some sources (Junie) have several candidate roots
+        self.default_roots = [default_root] if isinstance(default_root, str) else list(default_root)
+        self.default_root = self.default_roots[0] if self.default_roots else ''
+
+    def is_available(self, roots: Optional[List[str]] = None) -> bool:
+        """Cheap probe: does any of the source's session roots exist?"""
+        return any(os.path.isdir(os.path.expanduser(root)) for root in roots or self.default_roots)
+
+    def load_class(self) -> type:
+        """Import the parser module on first use and return the parser class."""
+        module = importlib.import_module(self.module)
+        return getattr(module, self.class_name)
+
+    def create_parser(self, roots: Optional[List[str]] = None) -> Any:
+        """Instantiate the parser with the given roots, or its default root."""
+        parser_class = self.load_class()
+        return parser_class(roots) if roots else parser_class()
+
+
+def jetbrains_cache_roots() -> List[str]:
+    """JetBrains IDE cache directories for this platform (Junie keeps sessions there)."""
+    if sys.platform == 'darwin':
+        return ['~/Library/Caches/JetBrains']
+    if sys.platform.startswith('win'):
+        local_app_data = os.environ.get('LOCALAPPDATA')
+        return [os.path.join(local_app_data, 'JetBrains')] if local_app_data else []
+    return [os.path.join(os.environ.get('XDG_CACHE_HOME') or '~/.cache', 'JetBrains')]
+
+
+def configured_roots() -> Dict[str, List[str]]:
+    """Extra session roots per source from roots.json in the work logger home.
+
+    The file maps source names to lists of directories, e.g. a dev container's
+    or a mounted build VM's ~/.claude/projects; a missing or malformed file
+    means no extra roots.
+    """
+    try:
+        with open(work_logger_home() / ROOTS_FILE, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        name: [root for root in roots if isinstance(root, str)]
+        for name, roots in data.items() if isinstance(roots, list)
+    }
+
+
+SOURCES: Dict[str, SourceSpec] = {}
+
+
+def register_source(spec: SourceSpec) -> None:
+    """Register (or replace) a session source."""
+    SOURCES[spec.name] = spec
+
+
+def resolve_sources(names: Optional[List[str]] = None) -> List[SourceSpec]:
+    """Return specs for the requested source names (all sources when None)."""
+    if not names:
+        return list(SOURCES.values())
+
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(
+            f"Unknown source(s): {', '.join(unknown)} "
+            f"(available: {', '.join(SOURCES)})"
+        )
+    return [SOURCES[name] for name in names]
+
+
+register_source(SourceSpec(
+    'claude', 'Claude Code', 'claude_projects_parser', 'ClaudeProjectsParser', '~/.claude/projects'
+))
+register_source(SourceSpec(
+    'codex', 'Codex', 'codex_sessions_parser', 'CodexSessionsParser', '~/.codex/sessions'
+))
+register_source(SourceSpec(
+    'junie', 'Junie', 'junie_sessions_parser', 'JunieSessionsParser', jetbrains_cache_roots()
+))
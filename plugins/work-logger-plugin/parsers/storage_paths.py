@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Locations of the work logger's local indexes and caches.
+
+Everything lives under ~/.claude/work-logger/ unless the WORK_LOGGER_HOME
+environment variable points somewhere else.
+"""
+
+import os
+from pathlib import Path
+
+
+def work_logger_home() -> Path:
+    """Root directory for indexes and caches."""
+    return Path(os.environ.get('WORK_LOGGER_HOME', '~/.claude/work-logger')).expanduser()
+
+
+def data_path(*parts: str) -> Path:
+    """Path of a file under the work logger home, creating its parent directory."""
+    path = work_logger_home().joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
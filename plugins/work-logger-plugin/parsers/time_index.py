@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Sparse sidecar time index for large plain JSONL session files.
+
+Every SAMPLE_LINES records or SAMPLE_BYTES bytes the reader notes a sample
+(high-water time, byte offset): the latest entry time seen anywhere before
+that offset. High-water marks never decrease, even when entry timestamps
+do, so a binary search for `since` finds an offset before which every
+entry is older than the window. The index is extended each time the file
+is read past its end; a file whose head or indexed tail changed is
+reindexed from scratch.
+"""
+
+import hashlib
+import json
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from storage_paths import data_path
+
+# Files smaller than this are cheap to scan and get no sidecar
+MIN_INDEXED_BYTES = 1 << 20
+SAMPLE_LINES = 1000
+SAMPLE_BYTES = 1 << 20
+# Bytes hashed at the head and at the end of the indexed range to detect rewrites
+CHECK_BYTES = 4096
+
+
+def sidecar_path(path: Path) -> Path:
+    """Location of the sidecar index for a session file."""
+    digest = hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:20]
+    return data_path('time-index', f"{digest}.json")
+
+
+def _digest_range(path: Path, start: int, length: int) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(start, 0))
+            return hashlib.sha1(f.read(length)).hexdigest()
+    except OSError:
+        return None
+
+
+class TimeIndex:
+    """(high-water time, offset) samples of one plain JSONL file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.marks: List[float] = []
+        self.offsets: List[int] = []
+        # Everything before indexed_to has been observed; high_water is its latest time
+        self.indexed_to = 0
+        self.high_water = float('-inf')
+        self.lines_since_sample = 0
+        self.dirty = False
+
+    @classmethod
+    def for_file(cls, path: Path) -> Optional['TimeIndex']:
+        """Load (or start) the index of a file, or None when it is too small to need one."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        if size < MIN_INDEXED_BYTES:
+            return None
+
+        index = cls(path)
+        try:
+            with open(sidecar_path(path), 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if index._is_valid(data, size):
+            index._restore(data)
+        return index
+
+    def _is_valid(self, data: Dict[str, Any], size: int) -> bool:
+        indexed_to = data.get('indexed_to', 0)
+        return (
+            data.get('file') == str(self.path)
+            and indexed_to <= size
+            and data.get('head') == _digest_range(self.path, 0, CHECK_BYTES)
+            and data.get('tail') == _digest_range(self.path, indexed_to - CHECK_BYTES, min(indexed_to, CHECK_BYTES))
+        )
+
+    def _restore(self, data: Dict[str, Any]) -> None:
+        self.marks = [float('-inf') if mark is None else mark for mark in data['marks']]
+        self.offsets = data['offsets']
+        self.indexed_to = data['indexed_to']
+        high_water = data.get('high_water')
+        self.high_water = float('-inf') if high_water is None else high_water
+        self.lines_since_sample = data.get('lines_since_sample', 0)
+
+    def start_offset(self, since: float) -> int:
+        """Latest sampled offset before which every entry is older than since (epoch)."""
+        position = bisect_left(self.marks, since) - 1
+        return self.offsets[position] if position >= 0 else 0
+
+    def observe(self, offset: int, length: int, timestamp: Optional[float]) -> None:
+        """Record one decoded line; lines inside the indexed range are ignored."""
+        if offset < self.indexed_to:
+            return
+        last_sample = self.offsets[-1] if self.offsets else 0
+        if self.lines_since_sample >= SAMPLE_LINES or offset - last_sample >= SAMPLE_BYTES:
+            self.marks.append(self.high_water)
+            self.offsets.append(offset)
+            self.lines_since_sample = 0
+        if timestamp is not None and timestamp > self.high_water:
+            self.high_water = timestamp
+        self.indexed_to = offset + length
+        self.lines_since_sample += 1
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the sidecar if new lines were indexed."""
+        if not self.dirty:
+            return
+
+        def mark(value: float) -> Optional[float]:
+            return None if value == float('-inf') else value
+
+        data = {
+            'file': str(self.path),
+            'head': _digest_range(self.path, 0, CHECK_BYTES),
+            'tail': _digest_range(self.path, self.indexed_to - CHECK_BYTES, min(self.indexed_to, CHECK_BYTES)),
+            'indexed_to': self.indexed_to,
+            'high_water': mark(self.high_water),
+            'lines_since_sample': self.lines_since_sample,
+            'marks': [mark(m) for m in self.marks],
+            'offsets': self.offsets,
+        }
+        target = sidecar_path(self.path)
+        tmp_path = target.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, target)
+        except OSError:
+            return
+        self.dirty = False